@@ -0,0 +1,41 @@
+"""Compare per-request allocation of TokenData vs AuthPrincipal.
+
+Run with: python -m benchmarks.auth_principal
+"""
+
+import sys
+import timeit
+import tracemalloc
+
+from src.schemas.auth import AuthPrincipal, TokenData
+
+ITERATIONS = 100_000
+
+
+def measure_memory(factory, count: int = ITERATIONS) -> float:
+    """Return average bytes retained per instance"""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    instances = [factory(i) for i in range(count)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del instances
+    return (after - before) / count
+
+
+def main():
+    token_data = lambda i: TokenData(user_id=i, username="user", role="user")
+    principal = lambda i: AuthPrincipal(i, "user", "user", None)
+
+    print(f"{'type':<15} {'bytes/instance':>15} {'usec/instance':>15}")
+    for name, factory in (("TokenData", token_data), ("AuthPrincipal", principal)):
+        size = measure_memory(factory)
+        seconds = timeit.timeit(lambda: factory(1), number=ITERATIONS)
+        print(f"{name:<15} {size:>15.1f} {seconds / ITERATIONS * 1e6:>15.3f}")
+
+    print(f"\nsys.getsizeof TokenData:     {sys.getsizeof(token_data(1))}")
+    print(f"sys.getsizeof AuthPrincipal: {sys.getsizeof(principal(1))}")
+
+
+if __name__ == "__main__":
+    main()
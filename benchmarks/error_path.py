@@ -0,0 +1,130 @@
+"""Measure error-path throughput through the ASGI stack: 401s and repeated 500s.
+
+"legacy" replicates the previous setup (ERROR log per 4xx, a formatted
+traceback per 500, JSONResponse serialization every time, 500s left to
+Starlette's ServerErrorMiddleware); "current" uses the handlers and
+middleware in src/middleware/error_handler.py. Requests go through a FastAPI
+app, and exceptions escaping it are logged the way uvicorn does ("Exception
+in ASGI application" with a traceback). Logs go to a null sink at INFO level,
+as in production.
+
+Run with: python -m benchmarks.error_path
+"""
+
+import asyncio
+import logging
+import os
+import time
+import traceback
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.requests import Request
+
+from src.middleware.error_handler import (
+    UnhandledExceptionMiddleware,
+    general_exception_handler,
+    http_exception_handler,
+)
+from src.utils.logger import logger
+
+ITERATIONS = 5_000
+
+server_logger = logging.getLogger("benchmarks.server")
+
+
+async def legacy_http_exception_handler(request: Request, exc: HTTPException):
+    logger.error(f"HTTP exception: {exc.detail}")
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"status": "error", "message": exc.detail},
+    )
+
+
+async def legacy_general_exception_handler(request: Request, exc: Exception):
+    logger.error(f"Unhandled exception: {str(exc)}")
+    logger.error(traceback.format_exc())
+    return JSONResponse(
+        status_code=500,
+        content={"status": "error", "message": "Internal server error"},
+    )
+
+
+def failing_call():
+    raise ValueError("database unavailable")
+
+
+def build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/unauthorized")
+    async def unauthorized():
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    @app.get("/fail")
+    async def fail():
+        failing_call()
+
+    if legacy:
+        app.add_exception_handler(StarletteHTTPException, legacy_http_exception_handler)
+        app.add_exception_handler(Exception, legacy_general_exception_handler)
+    else:
+        app.add_middleware(UnhandledExceptionMiddleware)
+        app.add_exception_handler(StarletteHTTPException, http_exception_handler)
+        app.add_exception_handler(Exception, general_exception_handler)
+    return app
+
+
+async def call(app: FastAPI, path: str) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8080),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    try:
+        await app(scope, receive, send)
+    except Exception as exc:
+        # What uvicorn does with an exception that escapes the app
+        server_logger.error("Exception in ASGI application\n", exc_info=exc)
+
+
+async def bench(name: str, app: FastAPI, path: str) -> None:
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await call(app, path)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<30} {ITERATIONS / elapsed:>12,.0f} responses/s")
+
+
+async def main():
+    logger.remove()
+    logger.add(lambda message: None, level="INFO")
+    server_logger.addHandler(logging.StreamHandler(open(os.devnull, "w")))
+    server_logger.propagate = False
+
+    legacy_app, current_app = build_app(legacy=True), build_app(legacy=False)
+    await bench("401 legacy", legacy_app, "/unauthorized")
+    await bench("401 current", current_app, "/unauthorized")
+    await bench("500 legacy", legacy_app, "/fail")
+    await bench("500 current", current_app, "/fail")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
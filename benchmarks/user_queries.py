@@ -0,0 +1,69 @@
+"""Compare full-entity ORM lookups against projected UserRepository queries.
+
+Uses an in-memory SQLite database so it runs without Postgres.
+Run with: python -m benchmarks.user_queries
+"""
+
+import timeit
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.models.base import Base
+from src.models.user import User
+from src.repositories.user_repository import UserRepository
+
+ITERATIONS = 5_000
+USER_COUNT = 1_000
+
+
+def setup_session():
+    """Create an in-memory database populated with test users"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Session()
+    db.add_all(
+        User(
+            username=f"user{i}",
+            email=f"user{i}@example.com",
+            password="x" * 60,
+        )
+        for i in range(USER_COUNT)
+    )
+    db.commit()
+    return db
+
+
+def bench(name: str, fn, db):
+    # Clear the identity map between calls so ORM lookups pay the full cost
+    def run():
+        fn()
+        db.expunge_all()
+
+    seconds = timeit.timeit(run, number=ITERATIONS)
+    print(f"{name:<40} {seconds / ITERATIONS * 1e6:>10.1f} usec/op")
+
+
+def main():
+    db = setup_session()
+    repo = UserRepository(db)
+    user_id = USER_COUNT // 2
+    username = f"user{user_id}"
+
+    bench("find_by_id(...).is_active", lambda: repo.find_by_id(user_id).is_active, db)
+    bench("is_active(...)", lambda: repo.is_active(user_id), db)
+    bench("find_by_username(...)", lambda: repo.find_by_username(username), db)
+    bench("exists_by_username(...)", lambda: repo.exists_by_username(username), db)
+    bench("find_by_id(...)", lambda: repo.find_by_id(user_id), db)
+    bench("find_summary_by_id(...)", lambda: repo.find_summary_by_id(user_id), db)
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
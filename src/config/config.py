@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -10,6 +10,9 @@ class Settings(BaseSettings):
     db_password: str = "postgres"
     db_name: str = "your-database-name"
     db_ssl_mode: str = "disable"
+    db_url: str = ""  # Full SQLAlchemy URL; overrides the DB_* settings above
+    # Comma-separated URLs of the user shards; empty disables sharding
+    db_shard_urls: str = ""
 
     # JWT
     jwt_secret: str = "your-secret-key-change-this-in-production"
@@ -20,6 +23,15 @@ class Settings(BaseSettings):
     server_port: int = 8080
     server_host: str = "0.0.0.0"
     server_env: str = "development"
+    server_workers: int = 0  # 0 = one per available CPU
+    server_backlog: int = 2048
+    server_keepalive: int = 5
+    server_graceful_timeout: int = 30
+    server_worker_timeout: int = 60
+    server_max_requests: int = 0  # 0 = never recycle workers
+    # Run migrations and seeding in the app lifespan; the production runner
+    # turns this off after running them once before starting the workers
+    run_migrations_on_startup: bool = True
 
     # Default Admin
     default_admin_username: str = "admin"
@@ -28,9 +40,43 @@ class Settings(BaseSettings):
 
     # Logging
     log_level: str = "INFO"
+    db_metrics_headers: bool = False  # Add X-DB-Queries/X-DB-Commits headers
+
+    # Background jobs
+    job_queue_workers: int = 4
+    job_queue_max_backlog: int = 1000
+    job_queue_max_attempts: int = 3
+    job_queue_retry_delay: float = 1.0
+    job_queue_durable: bool = False
+    job_queue_poll_interval: float = 1.0
+    job_queue_lease: float = 300.0  # seconds a claimed durable job may run
+    job_queue_retention_hours: float = 24.0  # 0 = keep finished jobs forever
+
+    # Audit trail
+    audit_batch_size: int = 500
+    audit_flush_interval: float = 2.0
+    audit_max_pending: int = 10000
+
+    # Admission control
+    admission_enabled: bool = True
+    admission_max_queue: int = 100
+    admission_queue_timeout: float = 2.0
+    admission_retry_after: int = 1
+
+    # Compression
+    compression_enabled: bool = True
+    compression_minimum_size: int = 500
+    compression_level: int = 6
+    compression_encodings: str = "br,zstd,gzip"
+
+    @property
+    def shard_urls(self) -> List[str]:
+        return [url.strip() for url in self.db_shard_urls.split(",") if url.strip()]
 
     @property
     def database_url(self) -> str:
+        if self.db_url:
+            return self.db_url
         return f"postgresql://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
 
     class Config:
@@ -1,33 +1,199 @@
-from sqlalchemy import create_engine
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.orm import Session, sessionmaker
 from .config import settings
+from .sharding import DIRECTORY_SHARD, ShardRouter
+from ..utils.logger import logger
+
+POOL_SIZE = 10
+POOL_MAX_OVERFLOW = 20
+
+
+def _create_engine(url: str) -> Engine:
+    return create_engine(
+        url,
+        echo=settings.server_env == "development",
+        pool_size=POOL_SIZE,
+        max_overflow=POOL_MAX_OVERFLOW,
+        pool_pre_ping=True,
+    )
+
 
 # Create database engine
-engine = create_engine(
-    settings.database_url,
-    echo=settings.server_env == "development",
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
+engine = _create_engine(settings.database_url)
+
+# Optional user shards, keyed by shard id ("0", "1", ...)
+shard_engines: Dict[str, Engine] = {
+    str(index): _create_engine(url) for index, url in enumerate(settings.shard_urls)
+}
+shard_router: Optional[ShardRouter] = (
+    ShardRouter(list(shard_engines)) if shard_engines else None
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create session factory. Objects stay loaded after commit so building the
+# response does not trigger another SELECT.
+if shard_router is None:
+    SessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+    )
+else:
+    SessionLocal = sessionmaker(
+        class_=ShardedSession,
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+        shards={DIRECTORY_SHARD: engine, **shard_engines},
+        **shard_router.session_options(),
+    )
 
 # Create base class for models
 Base = declarative_base()
 
 
+@dataclass
+class DBStats:
+    """Statements and commits issued while handling one request"""
+
+    queries: int = 0
+    commits: int = 0
+
+
+db_stats: ContextVar[Optional[DBStats]] = ContextVar("db_stats", default=None)
+
+
+def all_engines() -> List[Engine]:
+    """The main engine followed by any shard engines"""
+    return [engine, *shard_engines.values()]
+
+
+def user_engines() -> List[Engine]:
+    """Engines holding the users table"""
+    return list(shard_engines.values()) or [engine]
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    stats = db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+
+
+def _count_commit(conn):
+    stats = db_stats.get()
+    if stats is not None:
+        stats.commits += 1
+
+
+for _engine in all_engines():
+    event.listen(_engine, "before_cursor_execute", _count_query)
+    event.listen(_engine, "commit", _count_commit)
+
+
+_AFTER_COMMIT = "after_commit"
+
+
+def after_commit(db: Session, callback: Callable[[], None]) -> None:
+    """Run ``callback`` once the session's current transaction commits.
+
+    Use this for side effects of a unit of work (jobs, audit events) that must
+    not happen if it rolls back: pending callbacks are discarded on rollback.
+    """
+    if not db.in_transaction():
+        # Bind the callback to a transaction, so a rollback() discards it
+        db.begin()
+    db.info.setdefault(_AFTER_COMMIT, []).append(callback)
+
+
+def _run_after_commit(session: Session) -> None:
+    for callback in session.info.pop(_AFTER_COMMIT, ()):
+        try:
+            callback()
+        except Exception as e:
+            # The transaction is already committed; don't report it as failed
+            logger.error("After-commit callback {} failed: {}", callback, e)
+
+
+def _discard_after_commit(session: Session, previous_transaction) -> None:
+    session.info.pop(_AFTER_COMMIT, None)
+
+
+event.listen(Session, "after_commit", _run_after_commit)
+event.listen(Session, "after_soft_rollback", _discard_after_commit)
+
+
 def get_db():
-    """Dependency to get database session"""
+    """Dependency providing a request-scoped unit of work.
+
+    The session only checks out a pooled connection when the first statement
+    runs. Repositories flush instead of committing, so all writes made while
+    handling the request are committed once at the end, or rolled back if the
+    request fails.
+
+    FastAPI may run this teardown after the response has been sent, so
+    handlers that write should call ``db.commit()`` themselves before building
+    the response; a failed commit then becomes an error response. Anything
+    left uncommitted is committed here.
+    """
     db = SessionLocal()
     try:
         yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
 
+def _pool_usage(_engine: Engine) -> dict:
+    pool = _engine.pool
+    checked_out = pool.checkedout()
+    capacity = pool.size() + POOL_MAX_OVERFLOW
+    return {
+        "size": pool.size(),
+        "checked_out": checked_out,
+        "overflow": max(0, pool.overflow()),
+        "capacity": capacity,
+        "exhausted": checked_out >= capacity,
+    }
+
+
+def pool_status() -> dict:
+    """Connection pool usage, for readiness checks.
+
+    Totals cover every engine; ``exhausted`` is set if any single pool is,
+    since requests for the users on that shard would queue. With sharding,
+    ``pools`` breaks usage down per shard.
+    """
+    pools = {"main": _pool_usage(engine)}
+    for shard_id, _engine in shard_engines.items():
+        pools[shard_id] = _pool_usage(_engine)
+
+    status = {
+        key: sum(usage[key] for usage in pools.values())
+        for key in ("size", "checked_out", "overflow", "capacity")
+    }
+    status["exhausted"] = any(usage["exhausted"] for usage in pools.values())
+    if shard_engines:
+        status["pools"] = pools
+    return status
+
+
+def dispose_engine(close: bool = False):
+    """Discard pooled connections, e.g. those inherited from a parent process.
+
+    Call this in each worker after fork; the default ``close=False`` leaves
+    the parent's sockets untouched while the worker's pool starts empty. The
+    parent itself should pass ``close=True`` before forking.
+    """
+    for _engine in all_engines():
+        _engine.dispose(close=close)
+
+
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
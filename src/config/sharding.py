@@ -0,0 +1,64 @@
+import zlib
+from typing import Iterable, List, Optional
+from ..models.user import User
+
+# Shard id of the main database, which holds the user directory and every
+# table other than users
+DIRECTORY_SHARD = "directory"
+
+
+class ShardRouter:
+    """Places new users on shards and provides the ShardedSession choosers.
+
+    A new user's shard is picked by a stable hash (``place``) and stored in
+    the user directory; from then on the directory, not the hash, says where
+    the user lives, so adding a shard only affects users created afterwards.
+
+    Used as the chooser functions of a SQLAlchemy ``ShardedSession``: ``User``
+    rows live on their stored shard (``UserRepository`` names it on every
+    query and sets it on new users), everything else lives on the main
+    database. Queries on ``User`` that do not name a shard fan out to all
+    shards.
+    """
+
+    def __init__(self, shard_ids: Iterable[str]):
+        self.shard_ids: List[str] = list(shard_ids)
+
+    def place(self, key: str) -> str:
+        """Choose the shard for a new user, by a stable hash of ``key``"""
+        index = zlib.crc32(key.encode()) % len(self.shard_ids)
+        return self.shard_ids[index]
+
+    def shard_chooser(self, mapper, instance, clause=None) -> str:
+        if mapper is None or not issubclass(mapper.class_, User):
+            return DIRECTORY_SHARD
+        # Loaded users carry their shard as identity token and never get here
+        raise ValueError(
+            "Cannot choose a shard for a new User; create users through "
+            "UserRepository.create, which assigns one"
+        )
+
+    def identity_chooser(self, mapper, primary_key, **kw) -> List[str]:
+        if issubclass(mapper.class_, User):
+            return self.shard_ids
+        return [DIRECTORY_SHARD]
+
+    def execute_chooser(self, orm_context) -> List[str]:
+        mapper = orm_context.bind_mapper
+        if mapper is not None and issubclass(mapper.class_, User):
+            return self.shard_ids
+        return [DIRECTORY_SHARD]
+
+    def session_options(self) -> dict:
+        """Keyword arguments for a ShardedSession using this router"""
+        return {
+            "shard_chooser": self.shard_chooser,
+            "identity_chooser": self.identity_chooser,
+            "execute_chooser": self.execute_chooser,
+            "info": {"shard_router": self},
+        }
+
+
+def get_shard_router(db) -> Optional[ShardRouter]:
+    """Return the router a session was created with, or None if unsharded"""
+    return db.info.get("shard_router")
@@ -1,6 +1,9 @@
 from sqlalchemy import text
-from ..config.database import engine
+from ..config.database import all_engines, engine, shard_router, user_engines
 from ..models.user import User
+from ..models.user_directory import UserDirectory
+from ..models.job import Job
+from ..models.audit_event import AuditEvent
 from ..models.base import Base
 from ..utils.logger import logger
 
@@ -8,7 +11,10 @@ from ..utils.logger import logger
 def create_tables():
     """Create all database tables"""
     try:
-        Base.metadata.create_all(bind=engine)
+        # With sharding, every shard gets the full schema (only its users
+        # table is used) so all databases share one set of migrations
+        for engine in all_engines():
+            Base.metadata.create_all(bind=engine)
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating tables: {str(e)}")
@@ -18,7 +24,8 @@ def create_tables():
 def drop_tables():
     """Drop all database tables"""
     try:
-        Base.metadata.drop_all(bind=engine)
+        for engine in all_engines():
+            Base.metadata.drop_all(bind=engine)
         logger.info("Database tables dropped successfully")
     except Exception as e:
         logger.error(f"Error dropping tables: {str(e)}")
@@ -31,18 +38,51 @@ def migrate():
         # Create tables
         create_tables()
 
-        # Run any additional migrations here
+        # Run any additional migrations here (on every database with users)
+        for user_engine in user_engines():
+            with user_engine.connect() as conn:
+                # Example: Add indexes
+                conn.execute(
+                    text(
+                        "CREATE INDEX IF NOT EXISTS idx_users_username "
+                        "ON users(username);"
+                    )
+                )
+                conn.execute(
+                    text("CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);")
+                )
+                # Example: Add a column to an existing table (SQLite has no
+                # ADD COLUMN IF NOT EXISTS; create_all already added it there)
+                if conn.dialect.name == "postgresql":
+                    conn.execute(
+                        text(
+                            "ALTER TABLE users "
+                            "ADD COLUMN IF NOT EXISTS last_login_at TIMESTAMP"
+                        )
+                    )
+                conn.commit()
+
+        # Columns added to the jobs table (main database only)
         with engine.connect() as conn:
-            # Example: Add indexes
-            conn.execute(
-                text(
-                    "CREATE INDEX IF NOT EXISTS idx_users_username ON users(username);"
+            if conn.dialect.name == "postgresql":
+                conn.execute(
+                    text(
+                        "ALTER TABLE jobs "
+                        "ADD COLUMN IF NOT EXISTS claimed_by VARCHAR(100), "
+                        "ADD COLUMN IF NOT EXISTS locked_until TIMESTAMP, "
+                        "ADD COLUMN IF NOT EXISTS finished_at TIMESTAMP"
+                    )
                 )
-            )
-            conn.execute(
-                text("CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);")
-            )
-            conn.commit()
+                conn.execute(
+                    text(
+                        "CREATE INDEX IF NOT EXISTS ix_jobs_finished_at "
+                        "ON jobs(finished_at)"
+                    )
+                )
+                conn.commit()
+
+        if shard_router is not None:
+            backfill_directory_shards()
 
         logger.info("Database migration completed successfully")
     except Exception as e:
@@ -50,5 +90,38 @@ def migrate():
         raise
 
 
+def backfill_directory_shards():
+    """Record the shard of directory entries created before shard_id existed
+
+    Those users were placed by hashing their id, so the same hash over the
+    current shard list finds them (the list must not have changed since).
+    """
+    with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(
+                text(
+                    "ALTER TABLE user_directory "
+                    "ADD COLUMN IF NOT EXISTS shard_id VARCHAR(50)"
+                )
+            )
+        user_ids = conn.execute(
+            text("SELECT id FROM user_directory WHERE shard_id IS NULL")
+        ).scalars()
+        rows = [
+            {"user_id": user_id, "shard_id": shard_router.place(str(user_id))}
+            for user_id in user_ids
+        ]
+        if rows:
+            conn.execute(
+                text(
+                    "UPDATE user_directory SET shard_id = :shard_id "
+                    "WHERE id = :user_id"
+                ),
+                rows,
+            )
+            logger.info(f"Recorded the shard of {len(rows)} existing users")
+        conn.commit()
+
+
 if __name__ == "__main__":
     migrate()
@@ -13,7 +13,7 @@ def seed_database():
         user_repo = UserRepository(db)
 
         # Create default admin user if not exists
-        existing_admin = user_repo.find_by_username(settings.default_admin_username)
+        existing_admin = user_repo.exists_by_username(settings.default_admin_username)
 
         if not existing_admin:
             admin_data = {
@@ -25,6 +25,7 @@ def seed_database():
             }
 
             user_repo.create(admin_data)
+            db.commit()
             logger.info(
                 f"Default admin user created (username: {settings.default_admin_username}, password: {settings.default_admin_password})"
             )
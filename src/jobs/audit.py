@@ -0,0 +1,139 @@
+import asyncio
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from ..config.config import settings
+from ..config.database import SessionLocal
+from ..repositories.audit_repository import AuditRepository
+from ..utils.logger import logger
+
+
+class AuditBuffer:
+    """Buffers audit events and last-login times and writes them in batches.
+
+    Recording is a cheap in-memory append. A background task flushes the
+    buffer as one multi-row write when ``batch_size`` entries are pending or
+    every ``flush_interval`` seconds, whichever comes first. Once
+    ``max_pending`` entries are waiting (e.g. the database is slow) new events
+    are dropped and counted rather than growing memory without bound.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        max_pending: int = 10000,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._events: List[dict] = []
+        self._last_logins: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._events) + len(self._last_logins)
+
+    def record(
+        self, event: str, user_id: Optional[int] = None, detail: Optional[dict] = None
+    ) -> bool:
+        """Buffer an audit event; returns False if it was dropped"""
+        now = datetime.utcnow()
+        row = {
+            "user_id": user_id,
+            "event": event,
+            "detail": detail,
+            "created_at": now,
+            "updated_at": now,
+        }
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._events.append(row)
+        self._maybe_wake()
+        return True
+
+    def record_login(self, user_id: int) -> bool:
+        """Buffer a successful login: an audit event plus the last-login time"""
+        if not self.record("user.logged_in", user_id):
+            return False
+        with self._lock:
+            # Only the latest login per user needs to be written
+            self._last_logins[user_id] = datetime.utcnow()
+        return True
+
+    async def start(self) -> None:
+        """Start the background flusher"""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write whatever is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            self._loop = None
+        await asyncio.to_thread(self.flush)
+        if self.dropped:
+            logger.warning(f"Audit buffer dropped {self.dropped} events under load")
+
+    def flush(self) -> int:
+        """Write all buffered entries in one transaction; returns rows written"""
+        with self._lock:
+            events, self._events = self._events, []
+            last_logins, self._last_logins = self._last_logins, {}
+        if not events and not last_logins:
+            return 0
+
+        db = SessionLocal()
+        try:
+            AuditRepository(db).write_batch(events, last_logins)
+        except Exception as e:
+            db.rollback()
+            self._restore(events, last_logins)
+            logger.error(f"Failed to flush {len(events)} audit events: {e}")
+            return 0
+        finally:
+            db.close()
+        return len(events) + len(last_logins)
+
+    def _restore(self, events: List[dict], last_logins: Dict[int, datetime]) -> None:
+        # Put a failed batch back in front, keeping within max_pending
+        with self._lock:
+            room = max(0, self.max_pending - self.pending)
+            kept = events[:room]
+            self.dropped += len(events) - len(kept)
+            self._events = kept + self._events
+            for user_id, logged_in_at in last_logins.items():
+                self._last_logins.setdefault(user_id, logged_in_at)
+
+    def _maybe_wake(self) -> None:
+        if self._loop is not None and self.pending >= self.batch_size:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await asyncio.to_thread(self.flush)
+
+
+# Global audit buffer instance
+audit_buffer = AuditBuffer(
+    batch_size=settings.audit_batch_size,
+    flush_interval=settings.audit_flush_interval,
+    max_pending=settings.audit_max_pending,
+)
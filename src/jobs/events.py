@@ -0,0 +1,16 @@
+from .queue import job_queue
+from ..utils.logger import logger
+
+USER_REGISTERED = "user.registered"
+
+
+def on_user_registered(payload: dict):
+    """Handle a new registration: log it and send the welcome email"""
+    logger.info(f"User registered: {payload['username']}")
+    # Plug your email provider in here
+    logger.info(f"Sending welcome email to {payload['email']}")
+
+
+def register_handlers():
+    """Register the default event handlers with the job queue"""
+    job_queue.register(USER_REGISTERED, on_user_registered)
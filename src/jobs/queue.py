@@ -0,0 +1,311 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+from ..config.config import settings
+from sqlalchemy.orm import Session
+from ..config.database import SessionLocal, after_commit
+from ..repositories.job_repository import JobRepository
+from ..utils.logger import logger
+
+JobHandler = Callable[[dict], Union[None, Awaitable[None]]]
+
+
+@dataclass
+class QueuedJob:
+    name: str
+    payload: dict = field(default_factory=dict)
+    attempts: int = 0
+    job_id: Optional[int] = None
+    claim: Optional[str] = None
+
+
+class JobQueue:
+    """In-process async job queue for slow, non-critical side effects.
+
+    Jobs are handled by a pool of worker tasks on the application's event
+    loop; synchronous handlers run in a thread. Failed jobs are retried with
+    exponential backoff. The in-memory backlog is bounded: when it is full,
+    new jobs are dropped rather than slowing down the request.
+
+    In durable mode jobs are written to the ``jobs`` table and a poller feeds
+    them to the workers, so pending work survives restarts. Claimed jobs are
+    leased for ``lease`` seconds; a job still running when its lease expires
+    (its process died) is claimed again, so handlers must finish well within
+    the lease. Finished jobs are deleted after ``retention`` seconds.
+
+    Jobs enqueued with a session are tied to its unit of work: in durable mode
+    the row is added to that session (a transactional outbox), otherwise the
+    job is only queued once the session commits. Either way nothing runs for
+    a request that rolls back.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_backlog: int = 1000,
+        max_attempts: int = 3,
+        retry_delay: float = 1.0,
+        durable: bool = False,
+        poll_interval: float = 1.0,
+        lease: float = 300.0,
+        retention: float = 86400.0,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.workers = workers
+        self.max_backlog = max_backlog
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.durable = durable
+        self.poll_interval = poll_interval
+        self.lease = timedelta(seconds=lease)
+        self.retention = retention
+        self.session_factory = session_factory
+        # Identifies this process's claims in the jobs table
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._last_cleanup = 0.0
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self._poller: Optional[asyncio.Task] = None
+        self._retries: Dict[int, asyncio.TimerHandle] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    @property
+    def backlog(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def register(self, name: str, handler: JobHandler) -> None:
+        """Register the handler for a job name"""
+        self._handlers[name] = handler
+
+    def enqueue(
+        self, name: str, payload: Optional[dict] = None, db: Optional[Session] = None
+    ) -> bool:
+        """Queue a job, after ``db`` commits if given; returns False if dropped"""
+        if name not in self._handlers:
+            logger.warning(f"No handler registered for job '{name}'")
+            return False
+
+        payload = payload or {}
+        if db is not None:
+            if self.durable:
+                JobRepository(db).create(name, payload)
+            else:
+                after_commit(db, lambda: self._dispatch(name, payload))
+            return True
+        return self._dispatch(name, payload)
+
+    def _dispatch(self, name: str, payload: dict) -> bool:
+        if self.durable:
+            return self._persist(name, payload)
+
+        if not self.running:
+            logger.warning(f"Job queue not running, dropping job '{name}'")
+            return False
+
+        return self._submit(QueuedJob(name=name, payload=payload))
+
+    async def start(self) -> None:
+        """Start the worker pool (and the table poller in durable mode)"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_backlog)
+        self._tasks = [
+            asyncio.create_task(self._worker(i)) for i in range(self.workers)
+        ]
+        if self.durable:
+            self._poller = asyncio.create_task(self._poll())
+        logger.info(
+            f"Job queue started ({self.workers} workers, "
+            f"{'durable' if self.durable else 'in-memory'})"
+        )
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Drain queued jobs, then stop the workers"""
+        if not self.running:
+            return
+        if self._poller is not None:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+            self._poller = None
+        if self._retries:
+            logger.warning(f"Discarding {len(self._retries)} jobs awaiting retry")
+        for handle in self._retries.values():
+            handle.cancel()
+        self._retries.clear()
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Job queue stopped with {self.backlog} jobs pending")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+        self._queue = None
+        logger.info("Job queue stopped")
+
+    def _submit(self, job: QueuedJob) -> bool:
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is not self._loop:
+            # Called from a worker thread: hand the job to the loop thread
+            if self._queue.full():
+                logger.warning(f"Job queue full, dropping job '{job.name}'")
+                return False
+            self._loop.call_soon_threadsafe(self._put, job)
+            return True
+        return self._put(job)
+
+    def _put(self, job: QueuedJob) -> bool:
+        try:
+            self._queue.put_nowait(job)
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"Job queue full, dropping job '{job.name}'")
+            return False
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            except Exception as e:
+                logger.error(f"Job worker {index} error on '{job.name}': {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: QueuedJob) -> None:
+        handler = self._handlers[job.name]
+        if job.job_id is None:
+            job.attempts += 1
+        try:
+            if asyncio.iscoroutinefunction(handler):
+                await handler(job.payload)
+            else:
+                await asyncio.to_thread(handler, job.payload)
+        except Exception as e:
+            await self._retry(job, e)
+            return
+
+        if job.job_id is not None:
+            await asyncio.to_thread(
+                self._with_repository, "mark_done", job.job_id, job.claim
+            )
+
+    async def _retry(self, job: QueuedJob, error: Exception) -> None:
+        exhausted = job.attempts >= self.max_attempts
+        delay = self.retry_delay * 2 ** (job.attempts - 1)
+        if exhausted:
+            logger.error(
+                f"Job '{job.name}' failed after {job.attempts} attempts: {error}"
+            )
+        else:
+            logger.warning(
+                f"Job '{job.name}' failed (attempt {job.attempts}), "
+                f"retrying in {delay:.1f}s: {error}"
+            )
+
+        if job.job_id is not None:
+            retry_at = None
+            if not exhausted:
+                retry_at = datetime.utcnow() + timedelta(seconds=delay)
+            await asyncio.to_thread(
+                self._with_repository,
+                "mark_failed",
+                job.job_id,
+                job.claim,
+                str(error),
+                retry_at,
+            )
+        elif not exhausted:
+            self._retries[id(job)] = self._loop.call_later(delay, self._requeue, job)
+
+    def _requeue(self, job: QueuedJob) -> None:
+        self._retries.pop(id(job), None)
+        self._put(job)
+
+    async def _poll(self) -> None:
+        while True:
+            capacity = self.max_backlog - self._queue.qsize()
+            jobs = []
+            if capacity > 0:
+                try:
+                    jobs = await asyncio.to_thread(self._claim_due, capacity)
+                except Exception as e:
+                    logger.error(f"Failed to poll jobs table: {e}")
+            for job in jobs:
+                self._put(job)
+            await self._cleanup()
+            if len(jobs) < capacity:
+                await asyncio.sleep(self.poll_interval)
+            else:
+                await asyncio.sleep(0)
+
+    async def _cleanup(self) -> None:
+        # Delete finished jobs at most once a minute
+        if not self.retention or time.monotonic() - self._last_cleanup < 60:
+            return
+        self._last_cleanup = time.monotonic()
+        before = datetime.utcnow() - timedelta(seconds=self.retention)
+        try:
+            await asyncio.to_thread(self._with_repository, "delete_finished", before)
+        except Exception as e:
+            logger.error(f"Failed to delete finished jobs: {e}")
+
+    def _persist(self, name: str, payload: dict) -> bool:
+        db = self.session_factory()
+        try:
+            JobRepository(db).create(name, payload)
+            db.commit()
+            return True
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to persist job '{name}': {e}")
+            return False
+        finally:
+            db.close()
+
+    def _claim_due(self, limit: int) -> List[QueuedJob]:
+        claim = f"{self.owner}:{uuid.uuid4().hex[:12]}"
+        db = self.session_factory()
+        try:
+            claimed = JobRepository(db).claim_due(
+                list(self._handlers), limit, claim, self.lease
+            )
+            return [QueuedJob(**job) for job in claimed]
+        finally:
+            db.close()
+
+    def _with_repository(self, method: str, *args):
+        db = self.session_factory()
+        try:
+            return getattr(JobRepository(db), method)(*args)
+        finally:
+            db.close()
+
+
+# Global job queue instance
+job_queue = JobQueue(
+    workers=settings.job_queue_workers,
+    max_backlog=settings.job_queue_max_backlog,
+    max_attempts=settings.job_queue_max_attempts,
+    retry_delay=settings.job_queue_retry_delay,
+    durable=settings.job_queue_durable,
+    poll_interval=settings.job_queue_poll_interval,
+    lease=settings.job_queue_lease,
+    retention=settings.job_queue_retention_hours * 3600,
+)
@@ -1,20 +1,29 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from contextlib import asynccontextmanager
 import uvicorn
 import os
 
 from .config.config import settings
-from .config.database import init_db
+from .config.database import init_db, pool_status
 from .database.migrations import migrate
 from .database.seed import seed_database
+from .jobs.queue import job_queue
+from .jobs.audit import audit_buffer
+from .jobs.events import register_handlers
 from .routes.auth import router as auth_router
 from .routes.admin import router as admin_router
+from .middleware.admission import AdmissionController, AdmissionControlMiddleware
+from .middleware.compression import CompressionMiddleware
+from .middleware.db_metrics import DBMetricsMiddleware
 from .middleware.error_handler import (
     http_exception_handler,
     validation_exception_handler,
     general_exception_handler,
+    UnhandledExceptionMiddleware,
 )
 from .utils.logger import setup_logging
 
@@ -28,20 +37,28 @@ async def lifespan(app: FastAPI):
     # Create logs directory
     os.makedirs("logs", exist_ok=True)
 
-    # Initialize database
-    init_db()
+    if settings.run_migrations_on_startup:
+        # Initialize database
+        init_db()
 
-    # Run migrations
-    migrate()
+        # Run migrations
+        migrate()
 
-    # Seed database
-    seed_database()
+        # Seed database
+        seed_database()
+
+    # Start background jobs
+    register_handlers()
+    await job_queue.start()
+    await audit_buffer.start()
 
     logger.info(f"Server starting on {settings.server_host}:{settings.server_port}")
     yield
 
     # Shutdown
     logger.info("Shutting down...")
+    await job_queue.stop()
+    await audit_buffer.stop()
 
 
 # Setup logging
@@ -57,18 +74,50 @@ app = FastAPI(
     redoc_url="/redoc" if settings.server_env == "development" else None,
 )
 
-# Add CORS middleware
+# Answer unexpected errors with a 500 below Starlette's ServerErrorMiddleware
+# (innermost, so the response still passes through the other middlewares)
+app.add_middleware(UnhandledExceptionMiddleware)
+
+# Count database queries and commits per request
+app.add_middleware(DBMetricsMiddleware, expose_headers=settings.db_metrics_headers)
+
+# Add response compression
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        level=settings.compression_level,
+        encodings=[e.strip() for e in settings.compression_encodings.split(",")],
+    )
+
+# Shed load early when overloaded (outside everything but CORS, so rejected
+# requests are cheap yet still readable by cross-origin clients)
+admission_controller = AdmissionController(
+    max_queue=settings.admission_max_queue,
+    queue_timeout=settings.admission_queue_timeout,
+)
+if settings.admission_enabled:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        controller=admission_controller,
+        retry_after=settings.admission_retry_after,
+    )
+
+# Add CORS middleware (outermost, so every response gets CORS headers)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Configure this properly for production
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
 # Add exception handlers
-app.add_exception_handler(HTTPException, http_exception_handler)
+# Register for Starlette's base class so routing 404/405s are handled too
+app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
+# Fallback for errors raised by the middlewares themselves
 app.add_exception_handler(Exception, general_exception_handler)
 
 
@@ -79,6 +128,21 @@ async def ping():
     return {"message": "pong", "status": "healthy"}
 
 
+@app.get("/ready", tags=["Health"])
+async def ready():
+    """Readiness endpoint reflecting current saturation and DB pool state"""
+    pool = pool_status()
+    ready = not (admission_controller.saturated or pool["exhausted"])
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "saturated",
+            "admission": admission_controller.snapshot(),
+            "database_pool": pool,
+        },
+    )
+
+
 # Include routers
 app.include_router(auth_router, prefix="/api/v1")
 app.include_router(admin_router, prefix="/api/v1")
@@ -0,0 +1,227 @@
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Lower values are served first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+
+
+@dataclass
+class RouteClass:
+    """Concurrency settings for a group of routes with similar cost"""
+
+    name: str
+    initial_limit: int
+    min_limit: int
+    max_limit: int
+    target_latency: float  # seconds
+
+
+class AdaptiveLimiter:
+    """Concurrency limiter whose limit adapts to observed latency (AIMD).
+
+    Each request that finishes under the target latency raises the limit by
+    ``1 / limit`` (about +1 per window of ``limit`` requests); one that
+    exceeds it multiplies the limit by ``backoff``, at most once per window,
+    so a burst of slow requests from one latency spike counts as a single
+    congestion signal. Requests over the limit wait in a
+    priority queue of at most ``max_queue`` entries; beyond that, or after
+    ``queue_timeout`` seconds, they are rejected.
+    """
+
+    def __init__(
+        self,
+        route_class: RouteClass,
+        max_queue: int = 100,
+        queue_timeout: float = 2.0,
+        backoff: float = 0.9,
+    ):
+        self.route_class = route_class
+        self.limit = float(route_class.initial_limit)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.backoff = backoff
+        self.in_flight = 0
+        self.rejected = 0
+        self._completed = 0
+        # Completions before another slow request may lower the limit again
+        self._next_decrease_at = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def saturated(self) -> bool:
+        return self.queued >= self.max_queue // 2
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL) -> bool:
+        """Wait for a slot; returns False if the request should be shed"""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return True
+
+        # High-priority traffic may use the whole queue, the rest only half
+        queue_size = self.max_queue
+        if priority != PRIORITY_HIGH:
+            queue_size //= 2
+        if self.queued >= queue_size:
+            self.rejected += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self._abandon(future)
+            self.rejected += 1
+            return False
+        except asyncio.CancelledError:
+            # Client went away while queued
+            self._abandon(future)
+            raise
+
+    def release(self, latency: float) -> None:
+        """Release a slot and adapt the limit to the observed latency"""
+        route_class = self.route_class
+        self._completed += 1
+        if latency > route_class.target_latency:
+            if self._completed >= self._next_decrease_at:
+                # Requests in the current window were admitted under the old
+                # limit; their latency says nothing about the new one
+                self._next_decrease_at = self._completed + int(self.limit)
+                self.limit = max(route_class.min_limit, self.limit * self.backoff)
+        else:
+            self.limit = min(route_class.max_limit, self.limit + 1 / self.limit)
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    def _abandon(self, future: asyncio.Future) -> None:
+        if future.done() and not future.cancelled():
+            # Granted a slot just as we gave up: hand it back
+            self._release_slot()
+            return
+        future.cancel()
+        self._waiters = [w for w in self._waiters if w[2] is not future]
+        heapq.heapify(self._waiters)
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "saturated": self.saturated,
+        }
+
+
+DEFAULT_ROUTE_CLASSES = [
+    # Password hashing makes these expensive; keep their concurrency low
+    RouteClass("auth", initial_limit=8, min_limit=2, max_limit=32, target_latency=0.5),
+    RouteClass(
+        "default", initial_limit=64, min_limit=8, max_limit=512, target_latency=0.2
+    ),
+]
+
+
+class AdmissionController:
+    """Classifies requests and holds one adaptive limiter per route class"""
+
+    def __init__(
+        self,
+        route_classes: Optional[List[RouteClass]] = None,
+        max_queue: int = 100,
+        queue_timeout: float = 2.0,
+        exempt_paths: Tuple[str, ...] = ("/ping", "/ready"),
+        expensive_paths: Tuple[str, ...] = ("/auth/login", "/auth/register"),
+    ):
+        self.limiters: Dict[str, AdaptiveLimiter] = {
+            route_class.name: AdaptiveLimiter(route_class, max_queue, queue_timeout)
+            for route_class in (route_classes or DEFAULT_ROUTE_CLASSES)
+        }
+        self.exempt_paths = exempt_paths
+        self.expensive_paths = expensive_paths
+
+    def classify(self, scope: Scope) -> Tuple[Optional[str], int]:
+        """Return (route class or None if exempt, priority) for a request.
+
+        Authenticated reads get high priority. This runs before
+        authentication, so it only checks that an ``Authorization`` header is
+        present, not that it is valid: a request with a junk token still
+        jumps the queue, and is only rejected once it reaches authentication.
+        """
+        path = scope["path"]
+        if path in self.exempt_paths:
+            return None, PRIORITY_HIGH
+        if path.endswith(self.expensive_paths) and "auth" in self.limiters:
+            return "auth", PRIORITY_NORMAL
+        headers = Headers(scope=scope)
+        authenticated_read = scope["method"] in ("GET", "HEAD") and (
+            "authorization" in headers
+        )
+        return "default", PRIORITY_HIGH if authenticated_read else PRIORITY_NORMAL
+
+    @property
+    def saturated(self) -> bool:
+        return any(limiter.saturated for limiter in self.limiters.values())
+
+    def snapshot(self) -> dict:
+        return {name: limiter.snapshot() for name, limiter in self.limiters.items()}
+
+
+class AdmissionControlMiddleware:
+    """Shed load early with 503 + Retry-After instead of queueing forever"""
+
+    def __init__(
+        self, app: ASGIApp, controller: AdmissionController, retry_after: int = 1
+    ):
+        self.app = app
+        self.controller = controller
+        self.body = b'{"status":"error","message":"Server is busy, please retry"}'
+        self.headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self.body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class, priority = self.controller.classify(scope)
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.controller.limiters[route_class]
+        if not await limiter.acquire(priority):
+            await send(
+                {"type": "http.response.start", "status": 503, "headers": self.headers}
+            )
+            await send({"type": "http.response.body", "body": self.body})
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - started)
@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 from ..config.database import get_db
 from ..utils.auth import verify_token
 from ..repositories.user_repository import UserRepository
-from ..schemas.auth import TokenData
+from ..schemas.auth import AuthPrincipal
 
 security = HTTPBearer()
 
@@ -12,12 +12,12 @@ security = HTTPBearer()
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
-) -> TokenData:
+) -> AuthPrincipal:
     """Get current authenticated user"""
     token = credentials.credentials
-    token_data = verify_token(token)
+    principal = verify_token(token)
 
-    if token_data is None:
+    if principal is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
@@ -26,21 +26,21 @@ def get_current_user(
 
     # Verify user still exists and is active
     user_repo = UserRepository(db)
-    user = user_repo.find_by_id(token_data.user_id)
-
-    if not user or not user.is_active:
+    if not user_repo.is_active(principal.user_id, principal.shard_id):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or inactive",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    return token_data
+    return principal
 
 
-def require_admin(current_user: TokenData = Depends(get_current_user)) -> TokenData:
+def require_admin(
+    current_user: AuthPrincipal = Depends(get_current_user),
+) -> AuthPrincipal:
     """Require admin role"""
-    if current_user.role != "admin":
+    if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
         )
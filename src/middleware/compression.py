@@ -0,0 +1,196 @@
+import zlib
+from typing import Iterable, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        # zlib levels range 0-9
+        self._compressor = zlib.compressobj(
+            min(9, max(0, level)), zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, level: int):
+        # Brotli quality ranges 0-11
+        self._compressor = brotli.Compressor(quality=min(11, max(0, level)))
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int):
+        # zstd levels go up to 22 (negative levels trade ratio for speed)
+        level = min(22, level)
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_encodings() -> dict:
+    """Return the content encodings supported by the installed libraries"""
+    encodings = {"gzip": _GzipCompressor}
+    if brotli is not None:
+        encodings["br"] = _BrotliCompressor
+    if zstandard is not None:
+        encodings["zstd"] = _ZstdCompressor
+    return encodings
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """Parse an Accept-Encoding header into an {encoding: q-value} mapping"""
+    accepted = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token] = quality
+    return accepted
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli, zstd or gzip based on Accept-Encoding.
+
+    Bodies smaller than ``minimum_size`` are sent unchanged. Streaming
+    responses are compressed chunk by chunk instead of being buffered.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        level: int = 6,
+        encodings: Optional[Iterable[str]] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        supported = available_encodings()
+        preferred = encodings or ("br", "zstd", "gzip")
+        # Keep the configured preference order, dropping unavailable codecs
+        self.encodings = [name for name in preferred if name in supported]
+        self._factories = supported
+
+    def select_encoding(self, accept_encoding: str) -> Optional[str]:
+        """Pick the preferred encoding the client accepts"""
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        for name in self.encodings:
+            if accepted.get(name, wildcard) > 0:
+                return name
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        encoding = self.select_encoding(headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(
+            send, encoding, self._factories[encoding], self.level, self.minimum_size
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(
+        self, send: Send, encoding: str, factory, level: int, minimum_size: int
+    ):
+        self._send = send
+        self.encoding = encoding
+        self.factory = factory
+        self.level = level
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            # Delay the start message until we know whether to compress
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = "content-encoding" in headers
+            if self.passthrough:
+                await self._send(message)
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < self.minimum_size:
+                # Small complete body: not worth compressing
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            self.compressor = self.factory(self.level)
+            headers = MutableHeaders(raw=list(self.start_message["headers"]))
+            self.start_message["headers"] = headers.raw
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+
+            if not more_body:
+                body = self.compressor.compress(body) + self.compressor.flush()
+                headers["Content-Length"] = str(len(body))
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+
+            # Streaming: the final length is unknown, send chunked
+            del headers["Content-Length"]
+            await self._send(self.start_message)
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.flush()
+        await self._send(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
@@ -0,0 +1,47 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..config.database import DBStats, db_stats
+from ..utils.logger import logger
+
+
+class DBMetricsMiddleware:
+    """Count database statements and commits per request.
+
+    Counts are logged at DEBUG level and, when ``expose_headers`` is set,
+    returned as ``X-DB-Queries`` / ``X-DB-Commits`` response headers.
+
+    The headers are taken when the response starts, so they only count work
+    done before then. FastAPI runs ``get_db``'s teardown commit after the
+    response is sent: it shows up in the log line but not in ``X-DB-Commits``.
+    """
+
+    def __init__(self, app: ASGIApp, expose_headers: bool = False):
+        self.app = app
+        self.expose_headers = expose_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = DBStats()
+        token = db_stats.set(stats)
+
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.expose_headers:
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Queries"] = str(stats.queries)
+                headers["X-DB-Commits"] = str(stats.commits)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            db_stats.reset(token)
+            logger.debug(
+                "{} {}: {} queries, {} commits",
+                scope["method"],
+                scope["path"],
+                stats.queries,
+                stats.commits,
+            )
@@ -1,44 +1,170 @@
-from fastapi import Request, HTTPException, status
-from fastapi.responses import JSONResponse
+import json
+import os
+import traceback
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+from fastapi import Request, status
 from fastapi.exceptions import RequestValidationError
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from ..utils.logger import logger
-import traceback
 
+# Frames under src/ (other than this module's) identify where an error
+# happened; library frames below them are the same for every call site
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_THIS_FILE = os.path.abspath(__file__)
 
-async def http_exception_handler(request: Request, exc: HTTPException):
-    """Handle HTTP exceptions"""
-    logger.error(f"HTTP exception: {exc.detail}")
+
+@lru_cache(maxsize=256)
+def _static_error_body(message: str) -> bytes:
+    """Serialize an error body once per distinct message"""
+    return json.dumps(
+        {"status": "error", "message": message}, separators=(",", ":")
+    ).encode()
+
+
+def error_response(
+    message: Any, status_code: int, headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Build an error response, reusing pre-serialized bodies for string messages"""
+    if isinstance(message, str):
+        return Response(
+            content=_static_error_body(message),
+            status_code=status_code,
+            headers=headers,
+            media_type="application/json",
+        )
     return JSONResponse(
-        status_code=exc.status_code,
-        content={
-            "status": "error",
-            "message": exc.detail,
-        },
+        status_code=status_code,
+        content={"status": "error", "message": message},
+        headers=headers,
     )
 
 
+class ExceptionTracker:
+    """Deduplicates unhandled exceptions by fingerprint.
+
+    The first occurrence of a fingerprint (exception type plus the innermost
+    application frame) is logged with its traceback. Repeats are only counted and logged
+    as a one-line summary when the count reaches a power of two, so a storm of
+    identical failures costs a dictionary update instead of a formatted
+    traceback per request.
+    """
+
+    def __init__(self):
+        self.counts: Dict[Tuple[str, str, int], int] = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def fingerprint(exc: BaseException) -> Tuple[str, str, int]:
+        tb = exc.__traceback__
+        if tb is None:
+            return type(exc).__qualname__, "", 0
+        location = None
+        while tb is not None:
+            filename = tb.tb_frame.f_code.co_filename
+            if filename.startswith(_APP_DIR) and filename != _THIS_FILE:
+                location = (filename, tb.tb_lineno)
+            elif location is None and tb.tb_next is None:
+                # No application frame at all: fall back to the innermost one
+                location = (filename, tb.tb_lineno)
+            tb = tb.tb_next
+        return (type(exc).__qualname__, *location)
+
+    def record(self, exc: BaseException) -> int:
+        """Count an occurrence and log it if needed; returns the new count"""
+        key = self.fingerprint(exc)
+        with self._lock:
+            count = self.counts.get(key, 0) + 1
+            self.counts[key] = count
+
+        if count == 1:
+            logger.error(
+                "Unhandled exception {}: {}\n{}",
+                key[0],
+                exc,
+                "".join(traceback.format_exception(type(exc), exc, exc.__traceback__)),
+            )
+        elif count & (count - 1) == 0:
+            logger.error(
+                "Unhandled exception {} at {}:{} seen {} times (last: {})",
+                key[0],
+                key[1],
+                key[2],
+                count,
+                exc,
+            )
+        return count
+
+
+exception_tracker = ExceptionTracker()
+
+
+async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+    """Handle HTTP exceptions"""
+    if exc.status_code >= 500:
+        logger.error("HTTP {} on {}: {}", exc.status_code, request.url.path, exc.detail)
+    else:
+        # Client errors are expected; keep them out of the error log
+        logger.debug("HTTP {} on {}: {}", exc.status_code, request.url.path, exc.detail)
+    return error_response(exc.detail, exc.status_code, getattr(exc, "headers", None))
+
+
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle validation errors"""
-    logger.error(f"Validation error: {exc.errors()}")
+    errors = jsonable_encoder(exc.errors())
+    logger.debug("Validation error on {}: {}", request.url.path, errors)
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             "status": "error",
             "message": "Validation error",
-            "errors": exc.errors(),
+            "errors": errors,
         },
     )
 
 
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle general exceptions"""
-    logger.error(f"Unhandled exception: {str(exc)}")
-    logger.error(traceback.format_exc())
-
-    return JSONResponse(
-        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content={
-            "status": "error",
-            "message": "Internal server error",
-        },
+    exception_tracker.record(exc)
+    return error_response(
+        "Internal server error", status.HTTP_500_INTERNAL_SERVER_ERROR
     )
+
+
+class UnhandledExceptionMiddleware:
+    """Turn unexpected exceptions into 500 responses inside the app.
+
+    Starlette's ``ServerErrorMiddleware`` re-raises after calling the
+    ``Exception`` handler, so the server would still log a full traceback for
+    every 500. Installed innermost, this catches them first and leaves logging
+    to ``exception_tracker``. Errors raised after the response has started
+    cannot be answered and are re-raised.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_tracking_start(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_tracking_start)
+        except Exception as exc:
+            if response_started:
+                raise
+            response = await general_exception_handler(Request(scope), exc)
+            await response(scope, receive, send)
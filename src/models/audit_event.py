@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, Integer, JSON
+from .base import BaseModel
+
+
+class AuditEvent(BaseModel):
+    __tablename__ = "audit_events"
+
+    user_id = Column(Integer, nullable=True, index=True)
+    event = Column(String(50), nullable=False, index=True)
+    detail = Column(JSON(none_as_null=True), nullable=True)
+
+    def __repr__(self):
+        return f"<AuditEvent(id={self.id}, event='{self.event}')>"
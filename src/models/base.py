@@ -15,6 +15,10 @@ class BaseModel(Base):
     )
     deleted_at = Column(DateTime, nullable=True)
 
+    # Fetch server-generated values (id, timestamps) with RETURNING on
+    # INSERT/UPDATE instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
     def to_dict(self):
         """Convert model to dictionary"""
         return {
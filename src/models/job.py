@@ -0,0 +1,22 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime, Text, JSON
+from .base import BaseModel
+
+
+class Job(BaseModel):
+    __tablename__ = "jobs"
+
+    name = Column(String(100), nullable=False, index=True)
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(String(20), default="pending", nullable=False, index=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    run_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    last_error = Column(Text, nullable=True)
+    # Set while running: which claim owns the job, and until when. A job
+    # whose lease has expired (its process died) can be claimed again.
+    claimed_by = Column(String(100), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True, index=True)
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, name='{self.name}', status='{self.status}')>"
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String
+from .base import Base
+
+
+class UserDirectory(Base):
+    """Global lookup index for sharded users.
+
+    Lives in the main database. Its id sequence allocates user ids across all
+    shards, the unique username/email columns keep them globally unique, and
+    each entry records the shard that holds the user.
+    """
+
+    __tablename__ = "user_directory"
+
+    id = Column(Integer, primary_key=True)
+    username = Column(String(50), unique=True, nullable=False, index=True)
+    email = Column(String(100), unique=True, nullable=False, index=True)
+    shard_id = Column(String(50), nullable=False)
+
+    def __repr__(self):
+        return f"<UserDirectory(id={self.id}, username='{self.username}')>"
@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.orm import Session
+from ..config.sharding import DIRECTORY_SHARD, get_shard_router
+from ..models.audit_event import AuditEvent
+from ..models.user import User
+from .user_repository import UserRepository
+
+# Core statements (not ORM bulk operations) so they can also be routed to a
+# single shard of a ShardedSession; both run as one executemany per batch
+_INSERT_EVENTS = insert(AuditEvent.__table__)
+# updated_at is pinned to itself so its onupdate doesn't fire: it tracks
+# profile changes, not logins
+_users = User.__table__
+_UPDATE_LAST_LOGIN = (
+    update(_users)
+    .where(_users.c.id == bindparam("user_id"))
+    .values(last_login_at=bindparam("logged_in_at"), updated_at=_users.c.updated_at)
+)
+
+
+class AuditRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def write_batch(self, events: List[dict], last_logins: Dict[int, datetime]) -> None:
+        """Insert audit events and update last-login times in one transaction"""
+        router = get_shard_router(self.db)
+        if events:
+            self.db.execute(
+                _INSERT_EVENTS,
+                events,
+                bind_arguments={"shard_id": DIRECTORY_SHARD} if router else None,
+            )
+        for shard_id, rows in self._group_by_shard(last_logins).items():
+            self.db.execute(
+                _UPDATE_LAST_LOGIN,
+                rows,
+                bind_arguments={"shard_id": shard_id} if shard_id else None,
+            )
+        self.db.commit()
+
+    def _group_by_shard(
+        self, last_logins: Dict[int, datetime]
+    ) -> Dict[Optional[str], List[dict]]:
+        # Shards come from the user directory; users missing from it (deleted
+        # since they logged in) have no row to update
+        repository = UserRepository(self.db)
+        shards = repository.shards_for(last_logins) if repository.router else None
+        groups: Dict[Optional[str], List[dict]] = {}
+        for user_id, logged_in_at in last_logins.items():
+            shard_id = shards.get(user_id) if shards is not None else None
+            if shards is not None and shard_id is None:
+                continue
+            groups.setdefault(shard_id, []).append(
+                {"user_id": user_id, "logged_in_at": logged_in_at}
+            )
+        return groups
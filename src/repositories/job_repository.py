@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.orm import Session
+from ..models.job import Job
+
+
+class JobRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, name: str, payload: dict) -> Job:
+        """Add a pending job (committed with the session's unit of work)"""
+        job = Job(name=name, payload=payload, status="pending")
+        self.db.add(job)
+        return job
+
+    def claim_due(
+        self, names: List[str], limit: int, claim: str, lease: timedelta
+    ) -> List[dict]:
+        """Claim up to ``limit`` due jobs with the given names under ``claim``.
+
+        A job is due if it is pending and its run_at has passed, or if it is
+        running but its lease expired (the process running it died). Claimed
+        jobs are leased until ``now + lease``. Candidates are selected with
+        SKIP LOCKED so several processes can poll concurrently, and the
+        UPDATE re-checks that they are still claimable, so a job is never
+        claimed twice even on databases without row locks.
+
+        Returns plain dicts so callers need no further round trips after commit.
+        """
+        now = datetime.utcnow()
+        claimable = and_(
+            Job.name.in_(names),
+            Job.deleted_at.is_(None),
+            or_(
+                and_(Job.status == "pending", Job.run_at <= now),
+                and_(Job.status == "running", Job.locked_until < now),
+            ),
+        )
+        candidates = (
+            self.db.execute(
+                select(Job.id)
+                .where(claimable)
+                .order_by(Job.run_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            .scalars()
+            .all()
+        )
+        if not candidates:
+            self.db.commit()
+            return []
+
+        self.db.execute(
+            update(Job)
+            .where(Job.id.in_(candidates), claimable)
+            .values(
+                status="running",
+                attempts=Job.attempts + 1,
+                claimed_by=claim,
+                locked_until=now + lease,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        claimed = self.db.execute(
+            select(Job.id, Job.name, Job.payload, Job.attempts)
+            .where(Job.id.in_(candidates), Job.claimed_by == claim)
+            .order_by(Job.run_at)
+        ).all()
+        self.db.commit()
+        return [
+            {
+                "job_id": job.id,
+                "name": job.name,
+                "payload": job.payload,
+                "attempts": job.attempts,
+                "claim": claim,
+            }
+            for job in claimed
+        ]
+
+    def mark_done(self, job_id: int, claim: str) -> bool:
+        """Mark a job as completed, if ``claim`` still owns it"""
+        return self._finish(
+            job_id, claim, {"status": "done", "finished_at": datetime.utcnow()}
+        )
+
+    def mark_failed(
+        self,
+        job_id: int,
+        claim: str,
+        error: str,
+        retry_at: Optional[datetime] = None,
+    ) -> bool:
+        """Record a failure, rescheduling the job if ``retry_at`` is given"""
+        values = {"last_error": error}
+        if retry_at is not None:
+            values.update({"status": "pending", "run_at": retry_at})
+        else:
+            values.update({"status": "failed", "finished_at": datetime.utcnow()})
+        return self._finish(job_id, claim, values)
+
+    def delete_finished(self, before: datetime) -> int:
+        """Delete done and failed jobs that finished before ``before``"""
+        count = self.db.execute(
+            delete(Job)
+            .where(Job.status.in_(("done", "failed")), Job.finished_at < before)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        self.db.commit()
+        return count
+
+    def _finish(self, job_id: int, claim: str, values: dict) -> bool:
+        # A worker whose lease expired may no longer own the job
+        count = self.db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.claimed_by == claim)
+            .values(claimed_by=None, locked_until=None, **values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        self.db.commit()
+        return count == 1
@@ -1,23 +1,120 @@
-from typing import Optional, List
+import heapq
+from itertools import islice
+from typing import Dict, Iterable, Optional, List
+from sqlalchemy import bindparam, exists, inspect, select
+from sqlalchemy.engine import RowMapping
 from sqlalchemy.orm import Session
+from ..config.sharding import DIRECTORY_SHARD, get_shard_router
 from ..models.user import User
+from ..models.user_directory import UserDirectory
 from ..schemas.auth import RegisterRequest
 
+# Pre-built projection statements. They are constructed once at import time and
+# reused with bound parameters, so each call skips statement construction and
+# hits SQLAlchemy's compiled cache without loading or tracking ORM entities.
+_IS_ACTIVE_BY_ID = select(User.is_active).where(
+    User.id == bindparam("user_id"), User.deleted_at.is_(None)
+)
+_USERNAME_EXISTS = select(
+    exists().where(User.username == bindparam("username"), User.deleted_at.is_(None))
+)
+_EMAIL_EXISTS = select(
+    exists().where(User.email == bindparam("email"), User.deleted_at.is_(None))
+)
+_SUMMARY_BY_ID = select(User.id, User.username, User.role, User.is_active).where(
+    User.id == bindparam("user_id"), User.deleted_at.is_(None)
+)
+
+# Directory lookups, used when users are sharded
+_ENTRY_BY_USERNAME = select(UserDirectory.id, UserDirectory.shard_id).where(
+    UserDirectory.username == bindparam("username")
+)
+_ENTRY_BY_EMAIL = select(UserDirectory.id, UserDirectory.shard_id).where(
+    UserDirectory.email == bindparam("email")
+)
+_ENTRIES_BY_ID = select(UserDirectory.id, UserDirectory.shard_id).where(
+    UserDirectory.id.in_(bindparam("user_ids", expanding=True))
+)
+_DIRECTORY = {"shard_id": DIRECTORY_SHARD}
+
 
 class UserRepository:
+    """User data access.
+
+    When the session is sharded (see ``config/sharding.py``), each user's
+    shard is recorded in the user directory. Lookups by id go straight to one
+    shard when the caller knows it (e.g. from the JWT) and otherwise resolve
+    it through the directory, lookups by username/email resolve id and shard
+    there in one query, and ``get_all`` fans out to every shard and merges
+    the results by id. Resolved shards are cached for the repository's
+    lifetime.
+    """
+
     def __init__(self, db: Session):
         self.db = db
+        self.router = get_shard_router(db)
+        self._shards: Dict[int, str] = {}
+
+    def shard_for(self, user_id: int) -> Optional[str]:
+        """Return the shard holding the user, or None if unsharded or unknown"""
+        if self.router is None:
+            return None
+        return self.shards_for([user_id]).get(user_id)
+
+    def shards_for(self, user_ids: Iterable[int]) -> Dict[int, str]:
+        """Map each known user id to its shard with at most one directory query"""
+        if self.router is None:
+            return {}
+        user_ids = list(user_ids)
+        missing = [user_id for user_id in user_ids if user_id not in self._shards]
+        if missing:
+            rows = self.db.execute(
+                _ENTRIES_BY_ID, {"user_ids": missing}, bind_arguments=_DIRECTORY
+            )
+            self._shards.update(rows.tuples().all())
+        return {
+            user_id: self._shards[user_id]
+            for user_id in user_ids
+            if user_id in self._shards
+        }
+
+    def _shard_arguments(
+        self, user_id: int, shard_id: Optional[str] = None
+    ) -> Optional[dict]:
+        if self.router is None:
+            return None
+        return {"shard_id": shard_id or self.shard_for(user_id)}
 
     def create(self, user_data: dict) -> User:
-        """Create a new user"""
+        """Create a new user (committed with the request's unit of work)"""
+        shard_id = None
+        if self.router is not None:
+            # The directory allocates a globally unique id and records the
+            # shard, which is only hashed for new users
+            shard_id = self.router.place(user_data["username"])
+            entry = UserDirectory(
+                username=user_data["username"],
+                email=user_data["email"],
+                shard_id=shard_id,
+            )
+            self.db.add(entry)
+            self.db.flush()
+            user_data = {**user_data, "id": entry.id}
+            self._shards[entry.id] = shard_id
+
         user = User(**user_data)
+        if shard_id is not None:
+            inspect(user).identity_token = shard_id
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        # INSERT ... RETURNING fills in id and timestamps, no refresh needed
+        self.db.flush()
         return user
 
     def find_by_username(self, username: str) -> Optional[User]:
         """Find user by username"""
+        if self.router is not None:
+            user_id = self._directory_lookup(_ENTRY_BY_USERNAME, {"username": username})
+            return self.find_by_id(user_id) if user_id is not None else None
         return (
             self.db.query(User)
             .filter(User.username == username, User.deleted_at.is_(None))
@@ -26,17 +123,61 @@ class UserRepository:
 
     def find_by_email(self, email: str) -> Optional[User]:
         """Find user by email"""
+        if self.router is not None:
+            user_id = self._directory_lookup(_ENTRY_BY_EMAIL, {"email": email})
+            return self.find_by_id(user_id) if user_id is not None else None
         return (
             self.db.query(User)
             .filter(User.email == email, User.deleted_at.is_(None))
             .first()
         )
 
-    def find_by_id(self, user_id: int) -> Optional[User]:
+    def find_by_id(
+        self, user_id: int, shard_id: Optional[str] = None
+    ) -> Optional[User]:
         """Find user by ID"""
+        query = self.db.query(User).filter(
+            User.id == user_id, User.deleted_at.is_(None)
+        )
+        if self.router is not None:
+            shard_id = shard_id or self.shard_for(user_id)
+            if shard_id is None:
+                return None
+            query = query.set_shard(shard_id)
+        return query.first()
+
+    def is_active(self, user_id: int, shard_id: Optional[str] = None) -> Optional[bool]:
+        """Return the user's active flag, or None if the user does not exist"""
+        bind_arguments = self._shard_arguments(user_id, shard_id)
+        if bind_arguments is not None and bind_arguments["shard_id"] is None:
+            return None
+        return self.db.execute(
+            _IS_ACTIVE_BY_ID, {"user_id": user_id}, bind_arguments=bind_arguments
+        ).scalar()
+
+    def exists_by_username(self, username: str) -> bool:
+        """Check whether a user with the given username exists"""
+        if self.router is not None:
+            lookup = {"username": username}
+            return self._directory_lookup(_ENTRY_BY_USERNAME, lookup) is not None
+        return self.db.execute(_USERNAME_EXISTS, {"username": username}).scalar()
+
+    def exists_by_email(self, email: str) -> bool:
+        """Check whether a user with the given email exists"""
+        if self.router is not None:
+            return self._directory_lookup(_ENTRY_BY_EMAIL, {"email": email}) is not None
+        return self.db.execute(_EMAIL_EXISTS, {"email": email}).scalar()
+
+    def find_summary_by_id(self, user_id: int) -> Optional[RowMapping]:
+        """Find a user's id, username, role and is_active as a row mapping"""
+        bind_arguments = self._shard_arguments(user_id)
+        if bind_arguments is not None and bind_arguments["shard_id"] is None:
+            return None
         return (
-            self.db.query(User)
-            .filter(User.id == user_id, User.deleted_at.is_(None))
+            self.db.execute(
+                _SUMMARY_BY_ID, {"user_id": user_id}, bind_arguments=bind_arguments
+            )
+            .mappings()
             .first()
         )
 
@@ -46,8 +187,9 @@ class UserRepository:
         if user:
             for key, value in user_data.items():
                 setattr(user, key, value)
-            self.db.commit()
-            self.db.refresh(user)
+            if self.router is not None:
+                self._update_directory(user_id, user_data)
+            self.db.flush()
         return user
 
     def delete(self, user_id: int) -> bool:
@@ -57,16 +199,44 @@ class UserRepository:
             from datetime import datetime
 
             user.deleted_at = datetime.utcnow()
-            self.db.commit()
+            self.db.flush()
             return True
         return False
 
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[User]:
-        """Get all users"""
-        return (
-            self.db.query(User)
-            .filter(User.deleted_at.is_(None))
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+    def get_all(
+        self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None
+    ) -> List[User]:
+        """Get all users ordered by id, optionally starting after ``after_id``"""
+        query = self.db.query(User).filter(User.deleted_at.is_(None))
+        if after_id is not None:
+            query = query.filter(User.id > after_id)
+        query = query.order_by(User.id)
+
+        if self.router is None:
+            return query.offset(skip).limit(limit).all()
+
+        # Keyset pagination across shards: each shard returns its first
+        # skip + limit rows in id order, then the sorted lists are merged
+        per_shard = [
+            query.limit(skip + limit).set_shard(shard_id).all()
+            for shard_id in self.router.shard_ids
+        ]
+        merged = heapq.merge(*per_shard, key=lambda user: user.id)
+        return list(islice(merged, skip, skip + limit))
+
+    def _directory_lookup(self, statement, params: dict) -> Optional[int]:
+        """Return the user id for a directory entry, remembering its shard"""
+        entry = self.db.execute(statement, params, bind_arguments=_DIRECTORY).first()
+        if entry is None:
+            return None
+        self._shards[entry.id] = entry.shard_id
+        return entry.id
+
+    def _update_directory(self, user_id: int, user_data: dict) -> None:
+        changes = {
+            key: user_data[key] for key in ("username", "email") if key in user_data
+        }
+        if changes:
+            entry = self.db.get(UserDirectory, user_id)
+            for key, value in changes.items():
+                setattr(entry, key, value)
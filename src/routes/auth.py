@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from ..config.database import get_db
 from ..controllers.auth_controller import AuthController
 from ..middleware.auth_middleware import get_current_user
-from ..schemas.auth import LoginRequest, RegisterRequest, TokenData
+from ..schemas.auth import LoginRequest, RegisterRequest, AuthPrincipal
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 auth_controller = AuthController()
@@ -34,11 +35,19 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
 
 @router.get("/profile", summary="Get user profile")
 async def get_profile(
-    current_user: TokenData = Depends(get_current_user), db: Session = Depends(get_db)
+    current_user: AuthPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. id,username"
+    ),
 ):
     """
     Get current user's profile information.
 
     Requires valid JWT token in Authorization header.
+
+    - **fields**: Optional sparse fieldset to shrink the response
     """
-    return auth_controller.get_profile(current_user.user_id, db)
+    return auth_controller.get_profile(
+        current_user.user_id, db, fields, current_user.shard_id
+    )
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
 from typing import Optional
@@ -23,6 +24,7 @@ class UserResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     deleted_at: Optional[datetime] = None
+    last_login_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -37,3 +39,23 @@ class TokenData(BaseModel):
     user_id: Optional[int] = None
     username: Optional[str] = None
     role: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class AuthPrincipal:
+    """Lightweight authenticated principal used on the auth hot path.
+
+    Holds only what authorization needs, without pydantic validation or a
+    per-instance ``__dict__``.
+    """
+
+    __slots__ = ("user_id", "username", "role", "shard_id")
+
+    user_id: int
+    username: str
+    role: str
+    shard_id: Optional[str]  # None when users are not sharded
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == "admin"
@@ -0,0 +1,137 @@
+import os
+import uvicorn
+
+from .config.config import settings
+from .config.database import dispose_engine
+from .utils.logger import logger
+
+try:
+    from gunicorn.app.base import BaseApplication
+    from uvicorn_worker import UvicornWorker
+except ImportError:  # pragma: no cover - gunicorn is not available on Windows
+    BaseApplication = None
+    UvicornWorker = None
+
+
+def _module_available(name: str) -> bool:
+    try:
+        __import__(name)
+        return True
+    except ImportError:
+        return False
+
+
+def event_loop() -> str:
+    """Use uvloop when installed, otherwise the asyncio event loop"""
+    return "uvloop" if _module_available("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    """Use the httptools parser when installed, otherwise h11"""
+    return "httptools" if _module_available("httptools") else "h11"
+
+
+def worker_count() -> int:
+    """Number of worker processes, sized from the CPUs available to us"""
+    if settings.server_workers > 0:
+        return settings.server_workers
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    return max(1, cpus)
+
+
+if UvicornWorker is not None:
+
+    class TunedUvicornWorker(UvicornWorker):
+        """Uvicorn worker pinned to the fastest available loop and parser"""
+
+        CONFIG_KWARGS = {
+            **UvicornWorker.CONFIG_KWARGS,
+            "loop": event_loop(),
+            "http": http_protocol(),
+        }
+
+
+def post_fork(server, worker):
+    """Drop connections inherited from the master so workers never share them"""
+    dispose_engine()
+
+
+class ProductionApplication(BaseApplication or object):
+    """Gunicorn application that preloads the app before forking workers"""
+
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key.lower(), value)
+
+    def load(self):
+        from .main import app
+
+        return app
+
+
+def run_startup_tasks():
+    """Migrate and seed once, so workers don't race each other doing it"""
+    from .database.migrations import migrate
+    from .database.seed import seed_database
+
+    migrate()
+    seed_database()
+    dispose_engine(close=True)
+    settings.run_migrations_on_startup = False
+    # Spawned (non-forked) workers re-read settings from the environment
+    os.environ["RUN_MIGRATIONS_ON_STARTUP"] = "false"
+
+
+def run():
+    """Run the production server"""
+    run_startup_tasks()
+    workers = worker_count()
+    logger.info(
+        f"Starting {workers} worker(s) on {settings.server_host}:{settings.server_port} "
+        f"(loop={event_loop()}, http={http_protocol()})"
+    )
+
+    if BaseApplication is None:
+        # Without gunicorn each worker imports the app itself, so there is no
+        # preloading, but uvicorn still gives us multiple processes
+        uvicorn.run(
+            "src.main:app",
+            host=settings.server_host,
+            port=settings.server_port,
+            workers=workers,
+            loop=event_loop(),
+            http=http_protocol(),
+            backlog=settings.server_backlog,
+            timeout_keep_alive=settings.server_keepalive,
+            timeout_graceful_shutdown=settings.server_graceful_timeout,
+            log_level=settings.log_level.lower(),
+        )
+        return
+
+    options = {
+        "bind": f"{settings.server_host}:{settings.server_port}",
+        "workers": workers,
+        "worker_class": "src.server.TunedUvicornWorker",
+        "preload_app": True,
+        "post_fork": post_fork,
+        "backlog": settings.server_backlog,
+        "keepalive": settings.server_keepalive,
+        "graceful_timeout": settings.server_graceful_timeout,
+        "timeout": settings.server_worker_timeout,
+        "max_requests": settings.server_max_requests,
+        "max_requests_jitter": settings.server_max_requests // 10,
+        "loglevel": settings.log_level.lower(),
+    }
+    ProductionApplication(options).run()
+
+
+if __name__ == "__main__":
+    run()
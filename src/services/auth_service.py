@@ -1,24 +1,35 @@
+from functools import partial
 from typing import Optional
 from sqlalchemy.orm import Session
+from ..config.database import after_commit
 from ..repositories.user_repository import UserRepository
+from ..jobs.queue import JobQueue, job_queue
+from ..jobs.audit import AuditBuffer, audit_buffer
+from ..jobs.events import USER_REGISTERED
 from ..schemas.auth import LoginRequest, RegisterRequest, AuthResponse, UserResponse
 from ..utils.auth import hash_password, verify_password, create_access_token
-from ..utils.logger import logger
 from fastapi import HTTPException
 
 
 class AuthService:
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        jobs: Optional[JobQueue] = None,
+        audit: Optional[AuditBuffer] = None,
+    ):
         self.db = db
         self.user_repository = UserRepository(db)
+        self.jobs = jobs or job_queue
+        self.audit = audit or audit_buffer
 
     def register(self, request: RegisterRequest) -> AuthResponse:
         """Register a new user"""
         # Check if user already exists
-        if self.user_repository.find_by_username(request.username):
+        if self.user_repository.exists_by_username(request.username):
             raise HTTPException(status_code=400, detail="Username already exists")
 
-        if self.user_repository.find_by_email(request.email):
+        if self.user_repository.exists_by_email(request.email):
             raise HTTPException(status_code=400, detail="Email already exists")
 
         # Hash password
@@ -33,38 +44,53 @@ class AuthService:
         }
 
         user = self.user_repository.create(user_data)
-        logger.info(f"User registered: {user.username}")
-
-        # Generate token
-        token = create_access_token(
-            data={"user_id": user.id, "username": user.username, "role": user.role}
+        # Only audit registrations that actually commit
+        after_commit(self.db, partial(self.audit.record, "user.registered", user.id))
+        self.jobs.enqueue(
+            USER_REGISTERED,
+            {"user_id": user.id, "username": user.username, "email": user.email},
+            self.db,
         )
 
-        return AuthResponse(token=token, user=UserResponse.model_validate(user))
+        return AuthResponse(
+            token=self._create_token(user), user=UserResponse.model_validate(user)
+        )
 
     def login(self, request: LoginRequest) -> AuthResponse:
         """Login user"""
         # Find user
         user = self.user_repository.find_by_username(request.username)
         if not user or not verify_password(request.password, user.password):
+            self.audit.record(
+                "user.login_failed",
+                user.id if user else None,
+                {"username": request.username},
+            )
             raise HTTPException(status_code=401, detail="Invalid credentials")
 
         if not user.is_active:
+            self.audit.record("user.login_blocked", user.id)
             raise HTTPException(status_code=401, detail="Account is deactivated")
 
-        logger.info(f"User logged in: {user.username}")
+        # Buffered and batched; a durable job per login would cost three writes
+        self.audit.record_login(user.id)
 
-        # Generate token
-        token = create_access_token(
-            data={"user_id": user.id, "username": user.username, "role": user.role}
+        return AuthResponse(
+            token=self._create_token(user), user=UserResponse.model_validate(user)
         )
 
-        return AuthResponse(token=token, user=UserResponse.model_validate(user))
-
-    def get_profile(self, user_id: int) -> UserResponse:
+    def get_profile(self, user_id: int, shard_id: Optional[str] = None) -> UserResponse:
         """Get user profile"""
-        user = self.user_repository.find_by_id(user_id)
+        user = self.user_repository.find_by_id(user_id, shard_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
         return UserResponse.model_validate(user)
+
+    def _create_token(self, user) -> str:
+        """Create the JWT for a user, embedding its shard when sharded"""
+        claims = {"user_id": user.id, "username": user.username, "role": user.role}
+        shard_id = self.user_repository.shard_for(user.id)
+        if shard_id is not None:
+            claims["shard"] = shard_id
+        return create_access_token(data=claims)
@@ -3,7 +3,7 @@ from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from ..config.config import settings
-from ..schemas.auth import TokenData
+from ..schemas.auth import AuthPrincipal
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -34,8 +34,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[TokenData]:
-    """Verify JWT token and return token data"""
+def verify_token(token: str) -> Optional[AuthPrincipal]:
+    """Verify JWT token and return the authenticated principal"""
     try:
         payload = jwt.decode(
             token, settings.jwt_secret, algorithms=[settings.jwt_algorithm]
@@ -43,10 +43,11 @@ def verify_token(token: str) -> Optional[TokenData]:
         user_id: int = payload.get("user_id")
         username: str = payload.get("username")
         role: str = payload.get("role")
+        shard_id: Optional[str] = payload.get("shard")
 
         if user_id is None or username is None or role is None:
             return None
 
-        return TokenData(user_id=user_id, username=username, role=role)
+        return AuthPrincipal(user_id, username, role, shard_id)
     except JWTError:
         return None
@@ -1,17 +1,43 @@
-from typing import Any, Optional
+from typing import Any, Optional, Set
 from fastapi.responses import JSONResponse
 
 
 class APIResponse:
     @staticmethod
-    def success(message: str, data: Any = None, status_code: int = 200) -> JSONResponse:
-        """Create success response"""
+    def parse_fields(fields: Optional[str]) -> Optional[Set[str]]:
+        """Parse a sparse fieldset such as "id,username" into a set of names"""
+        if not fields:
+            return None
+        selected = {name.strip() for name in fields.split(",") if name.strip()}
+        return selected or None
+
+    @staticmethod
+    def select_fields(data: Any, fields: Optional[Set[str]]) -> Any:
+        """Keep only the requested fields of a dict or each dict in a list"""
+        if not fields:
+            return data
+        if isinstance(data, dict):
+            return {key: value for key, value in data.items() if key in fields}
+        if isinstance(data, list):
+            return [APIResponse.select_fields(item, fields) for item in data]
+        return data
+
+    @staticmethod
+    def success(
+        message: str,
+        data: Any = None,
+        status_code: int = 200,
+        fields: Optional[str] = None,
+    ) -> JSONResponse:
+        """Create success response, optionally trimmed to a sparse fieldset"""
         response_data = {
             "status": "success",
             "message": message,
         }
         if data is not None:
-            response_data["data"] = data
+            response_data["data"] = APIResponse.select_fields(
+                data, APIResponse.parse_fields(fields)
+            )
 
         return JSONResponse(content=response_data, status_code=status_code)
 
@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.orm import sessionmaker
+
+from src.config.sharding import DIRECTORY_SHARD, ShardRouter
+from src.models.base import Base
+from src.models.user import User  # noqa: F401  (register the tables)
+from src.models.user_directory import UserDirectory  # noqa: F401
+
+
+@pytest.fixture
+def make_shard_engine(tmp_path):
+    """Create a SQLite database with the full schema, as migrate() does"""
+    engines = []
+
+    def make(name):
+        engine = create_engine(f"sqlite:///{tmp_path / f'{name}.db'}")
+        Base.metadata.create_all(bind=engine)
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.dispose()
+
+
+@pytest.fixture
+def make_sharded_session():
+    """Open sessions configured like the application's SessionLocal"""
+    sessions = []
+
+    def make(engines, shard_ids):
+        factory = sessionmaker(
+            class_=ShardedSession,
+            autocommit=False,
+            autoflush=False,
+            expire_on_commit=False,
+            shards=engines,
+            **ShardRouter(shard_ids).session_options(),
+        )
+        sessions.append(factory())
+        return sessions[-1]
+
+    yield make
+    for db in sessions:
+        db.close()
+
+
+@pytest.fixture
+def shard_ids():
+    """The user shards of the sharded fixtures"""
+    return ["0", "1", "2"]
+
+
+@pytest.fixture
+def shard_engines(make_shard_engine, shard_ids):
+    """A main database plus the user shards, each in its own SQLite file"""
+    engines = {DIRECTORY_SHARD: make_shard_engine("main")}
+    for shard_id in shard_ids:
+        engines[shard_id] = make_shard_engine(f"shard{shard_id}")
+    return engines
+
+
+@pytest.fixture
+def sharded_db(make_sharded_session, shard_engines, shard_ids):
+    """A sharded session over shard_engines"""
+    return make_sharded_session(shard_engines, shard_ids)
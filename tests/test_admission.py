@@ -0,0 +1,181 @@
+import asyncio
+
+import pytest
+
+from src.middleware.admission import (
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    AdaptiveLimiter,
+    AdmissionController,
+    RouteClass,
+)
+
+FAST, SLOW = 0.01, 1.0
+
+
+def make_limiter(initial_limit=2, max_queue=4, queue_timeout=1.0, **limits):
+    limits.setdefault("min_limit", 1)
+    limits.setdefault("max_limit", 100)
+    route_class = RouteClass(
+        "test", initial_limit=initial_limit, target_latency=0.1, **limits
+    )
+    return AdaptiveLimiter(route_class, max_queue, queue_timeout)
+
+
+@pytest.mark.asyncio
+async def test_grants_up_to_the_limit_then_queues():
+    limiter = make_limiter(initial_limit=2)
+
+    assert await limiter.acquire()
+    assert await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.in_flight == 2 and limiter.queued == 1
+
+    limiter.release(FAST)
+    assert await waiter
+    assert limiter.in_flight == 2 and limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_high_priority_waiters_are_served_first():
+    limiter = make_limiter(initial_limit=1)
+    await limiter.acquire()
+    order = []
+
+    async def wait(name, priority):
+        await limiter.acquire(priority)
+        order.append(name)
+
+    normal = asyncio.create_task(wait("normal", PRIORITY_NORMAL))
+    await asyncio.sleep(0)
+    high = asyncio.create_task(wait("high", PRIORITY_HIGH))
+    await asyncio.sleep(0)
+
+    limiter.release(SLOW)
+    await asyncio.sleep(0.01)
+    limiter.release(SLOW)
+    await asyncio.gather(normal, high)
+    assert order == ["high", "normal"]
+
+
+@pytest.mark.asyncio
+async def test_normal_priority_may_only_use_half_the_queue():
+    limiter = make_limiter(initial_limit=1, max_queue=4)
+    await limiter.acquire()
+
+    waiters = [asyncio.create_task(limiter.acquire(PRIORITY_NORMAL)) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert not await limiter.acquire(PRIORITY_NORMAL)
+    waiters.append(asyncio.create_task(limiter.acquire(PRIORITY_HIGH)))
+    await asyncio.sleep(0)
+    assert limiter.queued == 3 and limiter.rejected == 1
+
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    assert limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_queued_requests_time_out():
+    limiter = make_limiter(initial_limit=1, queue_timeout=0.05)
+    await limiter.acquire()
+
+    assert not await limiter.acquire()
+    assert limiter.rejected == 1
+    assert limiter.queued == 0
+    assert limiter.in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_slot_granted_while_giving_up_is_handed_on():
+    limiter = make_limiter(initial_limit=1)
+    await limiter.acquire()
+    first = asyncio.create_task(limiter.acquire())
+    second = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    granted = limiter._waiters[0][2]
+
+    # The slot goes to the first waiter just as it times out
+    limiter.release(FAST)
+    assert granted.done()
+    limiter._abandon(granted)
+
+    assert limiter.in_flight == 1
+    assert await second
+    first.cancel()
+    await asyncio.gather(first, return_exceptions=True)
+
+
+def test_fast_requests_raise_the_limit_about_one_per_window():
+    limiter = make_limiter(initial_limit=10)
+    limiter.in_flight = 10
+    for _ in range(10):
+        limiter.release(FAST)
+    assert 10.9 < limiter.limit < 11
+
+
+def test_backoff_applies_once_per_window_of_slow_requests():
+    limiter = make_limiter(initial_limit=64, min_limit=8, max_limit=512)
+    limiter.in_flight = 200
+
+    # A whole window of slow requests from one latency spike
+    for _ in range(64):
+        limiter.release(SLOW)
+    assert limiter.limit == pytest.approx(64 * 0.9)
+
+    # Sustained slowness keeps backing off, one step per window
+    limiter.release(SLOW)
+    assert limiter.limit == pytest.approx(64 * 0.9 * 0.9)
+    for _ in range(56):
+        limiter.release(SLOW)
+    assert limiter.limit == pytest.approx(64 * 0.9 * 0.9)
+
+
+def test_limit_recovers_quickly_after_a_latency_spike():
+    limiter = make_limiter(initial_limit=64, min_limit=8, max_limit=512)
+    limiter.in_flight = 1000
+    for _ in range(64):
+        limiter.release(SLOW)
+    fast = 0
+    while limiter.limit < 64:
+        limiter.release(FAST)
+        fast += 1
+    # About one window per unit of lost limit, not thousands of requests
+    assert fast < 64 * 7
+
+
+def test_backoff_never_goes_below_the_minimum():
+    limiter = make_limiter(initial_limit=4, min_limit=3)
+    limiter.in_flight = 100
+    for _ in range(100):
+        limiter.release(SLOW)
+    assert limiter.limit == 3
+
+
+def scope(path, method="GET", headers=()):
+    return {"type": "http", "path": path, "method": method, "headers": list(headers)}
+
+
+def test_classify():
+    controller = AdmissionController()
+    token = [(b"authorization", b"Bearer anything")]
+
+    assert controller.classify(scope("/ping")) == (None, PRIORITY_HIGH)
+    assert controller.classify(scope("/api/v1/auth/login", "POST")) == (
+        "auth",
+        PRIORITY_NORMAL,
+    )
+    assert controller.classify(scope("/api/v1/auth/profile", headers=token)) == (
+        "default",
+        PRIORITY_HIGH,
+    )
+    assert controller.classify(scope("/api/v1/auth/profile")) == (
+        "default",
+        PRIORITY_NORMAL,
+    )
+    assert controller.classify(scope("/api/v1/x", "POST", token)) == (
+        "default",
+        PRIORITY_NORMAL,
+    )
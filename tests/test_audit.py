@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from src.config.sharding import DIRECTORY_SHARD
+from src.repositories.audit_repository import AuditRepository
+from src.repositories.user_repository import UserRepository
+
+
+def test_write_batch_records_events_and_last_logins(sharded_db, shard_engines):
+    repository = UserRepository(sharded_db)
+    users = [
+        repository.create(
+            {
+                "username": f"user{i}",
+                "email": f"user{i}@example.com",
+                "password": "not-a-real-hash",
+                "role": "user",
+            }
+        )
+        for i in range(6)
+    ]
+    sharded_db.commit()
+    registered_at = "2020-01-01 00:00:00"
+    for shard_id, engine in shard_engines.items():
+        if shard_id != DIRECTORY_SHARD:
+            with engine.begin() as conn:
+                conn.execute(
+                    text("UPDATE users SET updated_at = :t"), {"t": registered_at}
+                )
+    logged_in_at = datetime.utcnow() + timedelta(hours=1)
+
+    AuditRepository(sharded_db).write_batch(
+        [
+            {"user_id": user.id, "event": "user.logged_in", "detail": None}
+            for user in users
+        ],
+        {user.id: logged_in_at for user in users},
+    )
+
+    with shard_engines[DIRECTORY_SHARD].connect() as conn:
+        events = conn.execute(text("SELECT user_id, detail FROM audit_events")).all()
+    assert sorted(user_id for user_id, _ in events) == [user.id for user in users]
+    assert {detail for _, detail in events} == {None}
+
+    for user in users:
+        shard = shard_engines[repository.shard_for(user.id)]
+        with shard.connect() as conn:
+            row = conn.execute(
+                text("SELECT last_login_at, updated_at FROM users WHERE id = :id"),
+                {"id": user.id},
+            ).one()
+        assert row.last_login_at == str(logged_in_at)
+        # Logging in is not a profile change
+        assert row.updated_at == registered_at
@@ -0,0 +1,103 @@
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.middleware.compression import CompressionMiddleware, parse_accept_encoding
+
+LARGE_BODY = "compress me " * 200
+
+
+def build_client(**options):
+    async def large(request):
+        return PlainTextResponse(LARGE_BODY)
+
+    async def small(request):
+        return PlainTextResponse("tiny")
+
+    async def stream(request):
+        async def chunks():
+            for _ in range(5):
+                yield LARGE_BODY
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    async def encoded(request):
+        return PlainTextResponse(
+            LARGE_BODY, headers={"Content-Encoding": "identity-custom"}
+        )
+
+    app = Starlette(
+        routes=[
+            Route("/large", large),
+            Route("/small", small),
+            Route("/stream", stream),
+            Route("/encoded", encoded),
+        ]
+    )
+    app.add_middleware(CompressionMiddleware, encodings=["gzip"], **options)
+    return TestClient(app)
+
+
+def get_raw(client, path, accept_encoding="gzip"):
+    # Read the undecoded body, so we see exactly what was sent
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as r:
+        return r, b"".join(r.iter_raw())
+
+
+def test_large_body_is_gzipped():
+    response, body = get_raw(build_client(), "/large")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-length"] == str(len(body))
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert gzip.decompress(body).decode() == LARGE_BODY
+
+
+def test_small_body_is_sent_unchanged():
+    response, body = get_raw(build_client(), "/small")
+
+    assert "content-encoding" not in response.headers
+    assert body == b"tiny"
+
+
+def test_streaming_body_is_compressed_chunk_by_chunk():
+    response, body = get_raw(build_client(), "/stream")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(body).decode() == LARGE_BODY * 5
+
+
+def test_already_encoded_response_is_passed_through():
+    response, body = get_raw(build_client(), "/encoded")
+
+    assert response.headers["content-encoding"] == "identity-custom"
+    assert body.decode() == LARGE_BODY
+
+
+@pytest.mark.parametrize("accept_encoding", ["", "br", "gzip;q=0", "*;q=0"])
+def test_no_compression_when_gzip_not_accepted(accept_encoding):
+    response, body = get_raw(build_client(), "/large", accept_encoding)
+
+    assert "content-encoding" not in response.headers
+    assert body.decode() == LARGE_BODY
+
+
+@pytest.mark.parametrize("level", [-5, 0, 9, 11])
+def test_out_of_range_level_is_clamped(level):
+    response, body = get_raw(build_client(level=level), "/large")
+
+    assert response.status_code == 200
+    assert gzip.decompress(body).decode() == LARGE_BODY
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, br;q=0.5, zstd;q=oops, ,") == {
+        "gzip": 1.0,
+        "br": 0.5,
+        "zstd": 0.0,
+    }
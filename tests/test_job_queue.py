@@ -0,0 +1,301 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from src.config.database import after_commit
+from src.jobs.queue import JobQueue
+from src.models.base import Base
+from src.models.job import Job
+from src.repositories.job_repository import JobRepository
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessions on a SQLite file holding the jobs table"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(bind=engine, tables=[Job.__table__])
+    yield sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)
+    engine.dispose()
+
+
+def job_rows(session_factory):
+    db = session_factory()
+    try:
+        return db.execute(select(Job).order_by(Job.id)).scalars().all()
+    finally:
+        db.close()
+
+
+async def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+def durable_queue(session_factory, **options):
+    options.setdefault("poll_interval", 0.01)
+    return JobQueue(durable=True, session_factory=session_factory, **options)
+
+
+@pytest.mark.asyncio
+async def test_retries_with_exponential_backoff():
+    calls = []
+
+    def flaky(payload):
+        calls.append(time.monotonic())
+        if len(calls) < 3:
+            raise RuntimeError("temporary failure")
+
+    queue = JobQueue(workers=1, max_attempts=3, retry_delay=0.05)
+    queue.register("flaky", flaky)
+    await queue.start()
+    try:
+        assert queue.enqueue("flaky")
+        await wait_for(lambda: len(calls) == 3)
+    finally:
+        await queue.stop()
+
+    assert calls[1] - calls[0] >= 0.05
+    assert calls[2] - calls[1] >= 0.1
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_attempts():
+    calls = []
+
+    async def broken(payload):
+        calls.append(payload)
+        raise RuntimeError("permanent failure")
+
+    queue = JobQueue(workers=1, max_attempts=2, retry_delay=0.01)
+    queue.register("broken", broken)
+    await queue.start()
+    try:
+        queue.enqueue("broken", {"n": 1})
+        await wait_for(lambda: len(calls) == 2)
+        await asyncio.sleep(0.1)
+    finally:
+        await queue.stop()
+
+    assert calls == [{"n": 1}, {"n": 1}]
+
+
+@pytest.mark.asyncio
+async def test_drops_jobs_when_backlog_is_full():
+    queue = JobQueue(workers=0, max_backlog=2)
+    queue.register("noop", lambda payload: None)
+    await queue.start()
+    try:
+        assert [queue.enqueue("noop") for _ in range(3)] == [True, True, False]
+        assert queue.backlog == 2
+    finally:
+        await queue.stop(timeout=0.01)
+
+
+def test_drops_unregistered_jobs_and_jobs_while_stopped():
+    queue = JobQueue()
+    assert not queue.enqueue("unknown")
+    queue.register("noop", lambda payload: None)
+    assert not queue.enqueue("noop")
+
+
+@pytest.mark.asyncio
+async def test_jobs_enqueued_with_a_session_wait_for_commit(session_factory):
+    handled = []
+    queue = JobQueue(workers=1)
+    queue.register("event", handled.append)
+    await queue.start()
+    try:
+        committed, rolled_back = session_factory(), session_factory()
+        queue.enqueue("event", {"id": 1}, committed)
+        queue.enqueue("event", {"id": 2}, rolled_back)
+        await asyncio.sleep(0.05)
+        assert handled == []
+
+        committed.commit()
+        rolled_back.rollback()
+        rolled_back.commit()
+        await wait_for(lambda: handled)
+        await asyncio.sleep(0.05)
+    finally:
+        await queue.stop()
+
+    assert handled == [{"id": 1}]
+
+
+def test_after_commit_callbacks_are_discarded_on_rollback(session_factory):
+    db, calls = session_factory(), []
+    after_commit(db, lambda: calls.append("first"))
+    db.rollback()
+    after_commit(db, lambda: calls.append("second"))
+    db.commit()
+    db.commit()
+
+    assert calls == ["second"]
+
+
+def test_durable_jobs_are_written_with_the_unit_of_work(session_factory):
+    queue = durable_queue(session_factory)
+    queue.register("event", lambda payload: None)
+
+    db = session_factory()
+    queue.enqueue("event", {"id": 1}, db)
+    db.rollback()
+    assert job_rows(session_factory) == []
+
+    queue.enqueue("event", {"id": 2}, db)
+    db.commit()
+    assert [(job.payload, job.status) for job in job_rows(session_factory)] == [
+        ({"id": 2}, "pending")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_durable_poller_runs_and_finishes_jobs(session_factory):
+    handled = []
+    queue = durable_queue(session_factory)
+    queue.register("event", handled.append)
+    queue.enqueue("event", {"id": 1})
+    await queue.start()
+    try:
+        await wait_for(lambda: job_rows(session_factory)[0].status == "done")
+    finally:
+        await queue.stop()
+
+    job = job_rows(session_factory)[0]
+    assert handled == [{"id": 1}]
+    assert job.attempts == 1
+    assert job.finished_at is not None
+    assert job.claimed_by is None and job.locked_until is None
+
+
+@pytest.mark.asyncio
+async def test_durable_failures_are_rescheduled(session_factory):
+    calls = []
+
+    def flaky(payload):
+        calls.append(payload)
+        if len(calls) == 1:
+            raise RuntimeError("temporary failure")
+
+    queue = durable_queue(session_factory, retry_delay=0.05)
+    queue.register("flaky", flaky)
+    queue.enqueue("flaky")
+    await queue.start()
+    try:
+        await wait_for(lambda: job_rows(session_factory)[0].status == "done")
+    finally:
+        await queue.stop()
+
+    job = job_rows(session_factory)[0]
+    assert len(calls) == 2
+    assert job.attempts == 2
+    assert job.last_error == "temporary failure"
+
+
+@pytest.mark.asyncio
+async def test_starting_another_queue_does_not_rerun_running_jobs(session_factory):
+    executions = []
+    started = asyncio.Event()
+
+    async def slow(payload):
+        executions.append(payload["id"])
+        started.set()
+        await asyncio.sleep(0.3)
+
+    first, second = durable_queue(session_factory), durable_queue(session_factory)
+    for queue in (first, second):
+        queue.register("slow", slow)
+
+    first.enqueue("slow", {"id": 1})
+    await first.start()
+    try:
+        await asyncio.wait_for(started.wait(), 5)
+        # A sibling worker starting (or being recycled) mid-job
+        await second.start()
+        await wait_for(lambda: job_rows(session_factory)[0].status == "done")
+        await asyncio.sleep(0.1)
+    finally:
+        await first.stop()
+        await second.stop()
+
+    assert executions == [1]
+
+
+@pytest.mark.asyncio
+async def test_jobs_with_an_expired_lease_are_claimed_again(session_factory):
+    db = session_factory()
+    db.add(
+        Job(
+            name="event",
+            payload={"id": 1},
+            status="running",
+            attempts=1,
+            claimed_by="dead-process",
+            locked_until=datetime.utcnow() - timedelta(seconds=1),
+        )
+    )
+    db.commit()
+    db.close()
+
+    handled = []
+    queue = durable_queue(session_factory)
+    queue.register("event", handled.append)
+    await queue.start()
+    try:
+        await wait_for(lambda: job_rows(session_factory)[0].status == "done")
+    finally:
+        await queue.stop()
+
+    assert handled == [{"id": 1}]
+    assert job_rows(session_factory)[0].attempts == 2
+
+
+def test_only_the_current_claim_can_finish_a_job(session_factory):
+    db = session_factory()
+    repository = JobRepository(db)
+    repository.create("event", {})
+    db.commit()
+
+    [stale] = repository.claim_due(["event"], 10, "stale", timedelta(seconds=-1))
+    # Its lease is already over, so another worker takes the job
+    [current] = repository.claim_due(["event"], 10, "current", timedelta(minutes=5))
+    assert repository.claim_due(["event"], 10, "late", timedelta(minutes=5)) == []
+
+    assert not repository.mark_done(stale["job_id"], "stale")
+    assert repository.mark_done(current["job_id"], "current")
+    db.close()
+
+
+def test_delete_finished_keeps_recent_and_unfinished_jobs(session_factory):
+    now = datetime.utcnow()
+    db = session_factory()
+    db.add_all(
+        [
+            Job(
+                name="old",
+                payload={},
+                status="done",
+                finished_at=now - timedelta(days=2),
+            ),
+            Job(
+                name="failed",
+                payload={},
+                status="failed",
+                finished_at=now - timedelta(days=2),
+            ),
+            Job(name="recent", payload={}, status="done", finished_at=now),
+            Job(name="pending", payload={}, status="pending"),
+        ]
+    )
+    db.commit()
+
+    assert JobRepository(db).delete_finished(now - timedelta(days=1)) == 2
+    db.close()
+    assert [job.name for job in job_rows(session_factory)] == ["recent", "pending"]
@@ -0,0 +1,33 @@
+import json
+
+from src.utils.response import APIResponse
+
+
+def test_parse_fields():
+    assert APIResponse.parse_fields("id, username,,") == {"id", "username"}
+    assert APIResponse.parse_fields(" , ") is None
+    assert APIResponse.parse_fields(None) is None
+
+
+def test_select_fields_on_dict_and_list():
+    user = {"id": 1, "username": "alice", "email": "alice@example.com"}
+
+    assert APIResponse.select_fields(user, {"id", "missing"}) == {"id": 1}
+    assert APIResponse.select_fields([user, user], {"username"}) == [
+        {"username": "alice"},
+        {"username": "alice"},
+    ]
+    assert APIResponse.select_fields(user, None) == user
+    assert APIResponse.select_fields("scalar", {"id"}) == "scalar"
+
+
+def test_success_applies_sparse_fieldset():
+    response = APIResponse.success(
+        "ok", {"id": 1, "username": "alice", "email": "a@example.com"}, fields="id"
+    )
+
+    assert json.loads(response.body) == {
+        "status": "success",
+        "message": "ok",
+        "data": {"id": 1},
+    }
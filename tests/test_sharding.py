@@ -0,0 +1,241 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import text
+
+from src.config.sharding import DIRECTORY_SHARD
+from src.jobs.audit import AuditBuffer
+from src.jobs.queue import JobQueue
+from src.middleware.auth_middleware import get_current_user
+from src.repositories.user_repository import UserRepository
+from src.schemas.auth import RegisterRequest
+from src.services.auth_service import AuthService
+from src.utils.auth import create_access_token, verify_token
+
+USER_COUNT = 12
+
+
+def create_users(db, count=USER_COUNT):
+    repository = UserRepository(db)
+    users = [
+        repository.create(
+            {
+                "username": f"user{i}",
+                "email": f"user{i}@example.com",
+                "password": "not-a-real-hash",
+                "role": "user",
+            }
+        )
+        for i in range(count)
+    ]
+    db.commit()
+    return users
+
+
+def user_ids_on(engine):
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(text("SELECT id FROM users"))}
+
+
+def test_create_routes_each_user_to_its_shard(sharded_db, shard_engines, shard_ids):
+    users = create_users(sharded_db)
+    repository = UserRepository(sharded_db)
+
+    for shard_id in shard_ids:
+        expected = {
+            user.id for user in users if repository.shard_for(user.id) == shard_id
+        }
+        assert user_ids_on(shard_engines[shard_id]) == expected
+    # Users only live on shards; the main database holds the directory
+    assert user_ids_on(shard_engines[DIRECTORY_SHARD]) == set()
+    with shard_engines[DIRECTORY_SHARD].connect() as conn:
+        directory = conn.execute(
+            text("SELECT id, username, shard_id FROM user_directory")
+        )
+        assert {row.id: (row.username, row.shard_id) for row in directory} == {
+            user.id: (user.username, repository.shard_for(user.id)) for user in users
+        }
+
+
+def test_users_span_several_shards(sharded_db):
+    users = create_users(sharded_db)
+    repository = UserRepository(sharded_db)
+    assert len({repository.shard_for(user.id) for user in users}) > 1
+
+
+def test_find_by_id_username_and_email(sharded_db):
+    users = create_users(sharded_db)
+    repository = UserRepository(sharded_db)
+
+    for user in users:
+        assert repository.find_by_id(user.id).username == user.username
+        assert repository.find_by_username(user.username).id == user.id
+        assert repository.find_by_email(user.email).id == user.id
+        assert repository.exists_by_username(user.username)
+        assert repository.is_active(user.id) is True
+
+    assert repository.find_by_username("nobody") is None
+    assert repository.find_by_email("nobody@example.com") is None
+    assert not repository.exists_by_email("nobody@example.com")
+    assert repository.find_by_id(10_000) is None
+    assert repository.is_active(10_000) is None
+
+
+def test_find_by_id_on_wrong_shard_finds_nothing(sharded_db, shard_ids):
+    user = create_users(sharded_db, 1)[0]
+    repository = UserRepository(sharded_db)
+    wrong_shard = next(s for s in shard_ids if s != repository.shard_for(user.id))
+
+    assert repository.find_by_id(user.id, wrong_shard) is None
+    assert repository.is_active(user.id, wrong_shard) is None
+
+
+def test_update_changes_shard_row_and_directory(sharded_db, shard_engines):
+    user = create_users(sharded_db, 1)[0]
+    old_username = user.username
+    repository = UserRepository(sharded_db)
+
+    repository.update(user.id, {"username": "renamed", "is_active": False})
+    sharded_db.commit()
+
+    assert repository.find_by_username(old_username) is None
+    assert repository.find_by_username("renamed").id == user.id
+    assert repository.is_active(user.id) is False
+    with shard_engines[repository.shard_for(user.id)].connect() as conn:
+        row = conn.execute(
+            text("SELECT username FROM users WHERE id = :id"), {"id": user.id}
+        ).one()
+    assert row.username == "renamed"
+
+
+def test_delete_soft_deletes_on_the_users_shard(sharded_db, shard_engines):
+    users = create_users(sharded_db, 3)
+    repository = UserRepository(sharded_db)
+    deleted = users[1]
+
+    assert repository.delete(deleted.id)
+    sharded_db.commit()
+
+    assert repository.find_by_id(deleted.id) is None
+    assert repository.find_by_id(users[0].id) is not None
+    assert deleted.id not in [user.id for user in repository.get_all()]
+    with shard_engines[repository.shard_for(deleted.id)].connect() as conn:
+        deleted_at = conn.execute(
+            text("SELECT deleted_at FROM users WHERE id = :id"), {"id": deleted.id}
+        ).scalar()
+    assert deleted_at is not None
+    assert not repository.delete(10_000)
+
+
+def test_get_all_merges_shards_in_id_order(sharded_db):
+    users = create_users(sharded_db)
+    all_ids = sorted(user.id for user in users)
+
+    assert [user.id for user in UserRepository(sharded_db).get_all()] == all_ids
+
+
+@pytest.mark.parametrize("skip,limit", [(0, 5), (3, 4), (10, 5), (12, 5)])
+def test_get_all_skip_and_limit(sharded_db, skip, limit):
+    users = create_users(sharded_db)
+    all_ids = sorted(user.id for user in users)
+
+    page = UserRepository(sharded_db).get_all(skip=skip, limit=limit)
+    assert [user.id for user in page] == all_ids[skip : skip + limit]
+
+
+def test_get_all_keyset_pages_cover_every_user(sharded_db):
+    users = create_users(sharded_db)
+    repository = UserRepository(sharded_db)
+
+    seen, after_id = [], None
+    while True:
+        page = repository.get_all(limit=5, after_id=after_id)
+        if not page:
+            break
+        seen.extend(user.id for user in page)
+        after_id = page[-1].id
+
+    assert seen == sorted(user.id for user in users)
+    assert [u.id for u in repository.get_all(skip=2, limit=3, after_id=seen[4])] == (
+        seen[7:10]
+    )
+
+
+def register(db, username="alice"):
+    service = AuthService(db, jobs=JobQueue(), audit=AuditBuffer())
+    result = service.register(
+        RegisterRequest(
+            username=username, email=f"{username}@example.com", password="secret1"
+        )
+    )
+    db.commit()
+    return result
+
+
+def bearer(token):
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def test_shard_claim_round_trips_through_get_current_user(sharded_db):
+    result = register(sharded_db)
+    expected_shard = UserRepository(sharded_db).shard_for(result.user.id)
+
+    assert verify_token(result.token).shard_id == expected_shard
+    principal = get_current_user(bearer(result.token), sharded_db)
+    assert principal.user_id == result.user.id
+    assert principal.shard_id == expected_shard
+
+
+def test_get_current_user_uses_the_shard_claim(sharded_db, shard_ids):
+    user = register(sharded_db).user
+    wrong_shard = next(
+        s for s in shard_ids if s != UserRepository(sharded_db).shard_for(user.id)
+    )
+    token = create_access_token(
+        {
+            "user_id": user.id,
+            "username": user.username,
+            "role": user.role,
+            "shard": wrong_shard,
+        }
+    )
+
+    # The claim is trusted as the user's location, so the lookup misses
+    with pytest.raises(HTTPException) as error:
+        get_current_user(bearer(token), sharded_db)
+    assert error.value.status_code == 401
+
+
+def test_token_without_shard_claim_is_routed_by_the_directory(sharded_db):
+    user = register(sharded_db).user
+    token = create_access_token(
+        {"user_id": user.id, "username": user.username, "role": user.role}
+    )
+
+    assert get_current_user(bearer(token), sharded_db).user_id == user.id
+
+
+def test_adding_a_shard_keeps_existing_users_where_they_are(
+    sharded_db, shard_engines, shard_ids, make_shard_engine, make_sharded_session
+):
+    registered = [register(sharded_db, f"user{i}") for i in range(USER_COUNT)]
+    sharded_db.close()
+
+    # Redeploy with one more entry in DB_SHARD_URLS
+    grown_db = make_sharded_session(
+        {**shard_engines, "3": make_shard_engine("shard3")}, [*shard_ids, "3"]
+    )
+    repository = UserRepository(grown_db)
+    for result in registered:
+        user = result.user
+        assert repository.find_by_id(user.id).username == user.username
+        assert repository.find_by_username(user.username).id == user.id
+        assert repository.find_by_email(user.email).id == user.id
+        # Tokens issued before the change keep working
+        assert get_current_user(bearer(result.token), grown_db).user_id == user.id
+    assert len(repository.get_all()) == USER_COUNT
+
+    # Only new users are placed on the new shard
+    newcomers = [register(grown_db, f"newcomer{i}").user for i in range(USER_COUNT)]
+    assert "3" in {repository.shard_for(user.id) for user in newcomers}
+    assert "3" not in {repository.shard_for(r.user.id) for r in registered}